@@ -0,0 +1,141 @@
+# backend/app/cache.py
+"""Versioned in-process cache of the vending_locations table.
+
+The table changes about once a month, so endpoints read from structures
+built in memory (spatial index, response snapshot, ...) and only rebuild
+them when the data version changes. The data version is a single aggregate
+query over a per-row checksum, re-checked at most every
+DATA_VERSION_CHECK_SECONDS.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+
+from sqlalchemy import Float, String, cast, event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import ACTIVE_ROWS, COORDINATE_COLUMNS, VendingLocation
+from .store import LocationStore
+
+DATA_VERSION_CHECK_SECONDS = float(os.getenv("DATA_VERSION_CHECK_SECONDS", "30"))
+
+
+ROW_SEPARATOR = "\x1f"
+
+
+def row_checksum():
+    """CRC32 of one row's values, joined so moving text between columns still counts"""
+    text = None
+    for column in VendingLocation.__table__.columns:
+        value = func.coalesce(cast(column, String), "")
+        text = value if text is None else text + ROW_SEPARATOR + value
+    return func.crc32(text)
+
+
+@event.listens_for(Engine, "connect")
+def register_sqlite_crc32(dbapi_connection, connection_record):
+    """MySQL has CRC32() built in; give SQLite connections the same function"""
+    if isinstance(dbapi_connection, sqlite3.Connection) or type(dbapi_connection).__module__.endswith("aiosqlite"):
+        dbapi_connection.create_function(
+            "crc32", 1, lambda text: None if text is None else zlib.crc32(text.encode("utf-8")),
+        )
+
+
+async def compute_data_version(db: AsyncSession) -> str:
+    """Fingerprint the table contents with a single aggregate query.
+
+    Sums a checksum of every row's values, so any edit to any column moves
+    the version, not just ones that change row counts or text lengths.
+    """
+    result = await db.execute(select(func.count(VendingLocation.id), func.sum(row_checksum())))
+    row = result.one()
+    return hashlib.sha1(repr((row[0], int(row[1] or 0))).encode("utf-8")).hexdigest()[:16]
+
+
+def store_query():
+    """Core select of every active row, coordinates cast to floats in SQL"""
+    columns = [
+        cast(column, Float).label(column.name) if column.name in COORDINATE_COLUMNS else column
+        for column in VendingLocation.__table__.columns
+    ]
+    return select(*columns).where(ACTIVE_ROWS)
+
+
+async def load_store(db: AsyncSession) -> LocationStore:
+    """Read the table into a LocationStore without building ORM objects"""
+    result = await db.execute(store_query())
+    return LocationStore(result.mappings())
+
+
+# name -> builder(locations) for every artifact derived from the table
+ARTIFACT_BUILDERS = {}
+
+
+def register_artifact(name, builder):
+    """Declare an artifact to build from the rows whenever the data version moves"""
+    ARTIFACT_BUILDERS[name] = builder
+
+
+class DatasetCache:
+    """Location rows plus artifacts derived from them, keyed by data version.
+
+    On every reload all registered artifacts are built from one shared list
+    of row dicts, which is then dropped: only the column arrays and whatever
+    the artifacts themselves keep stay resident.
+    """
+
+    def __init__(self, check_interval=DATA_VERSION_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self.version = None
+        self.store = None
+        self.artifacts = {}
+        self._checked_at = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self):
+        return (
+            self._checked_at is not None
+            and time.monotonic() - self._checked_at < self.check_interval
+        )
+
+    async def refresh(self, db: AsyncSession):
+        """Reload rows and rebuild derived artifacts if the data version moved"""
+        if self._is_fresh():
+            return
+        # One request re-checks the version; concurrent ones wait for it
+        async with self._lock:
+            if self._is_fresh():
+                return
+            version = await compute_data_version(db)
+            if version != self.version or self.store is None:
+                store = await load_store(db)
+                locations = store.to_dicts()
+                self.artifacts = {name: builder(locations) for name, builder in ARTIFACT_BUILDERS.items()}
+                self.store = store
+                self.version = version
+            self._checked_at = time.monotonic()
+
+    async def get_store(self, db: AsyncSession) -> LocationStore:
+        """The current LocationStore, reloaded if the data version moved"""
+        await self.refresh(db)
+        return self.store
+
+    async def get(self, name, db: AsyncSession):
+        """Return artifact `name` for the current data version"""
+        await self.refresh(db)
+        if name not in self.artifacts:
+            # Registered after the last reload
+            self.artifacts[name] = ARTIFACT_BUILDERS[name](self.store.to_dicts())
+        return self.artifacts[name]
+
+    def invalidate(self):
+        """Reload the table and rebuild every artifact on the next request, whatever the version says"""
+        self.version = None
+        self._checked_at = None
+
+
+dataset_cache = DatasetCache()
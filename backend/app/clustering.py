@@ -0,0 +1,120 @@
+# backend/app/clustering.py
+"""Hierarchical marker clustering precomputed per zoom level.
+
+Works like supercluster with a grid instead of a radius search: at each
+zoom from max_zoom down to 0, the clusters of the zoom above are grouped by
+a grid whose cells are `radius_px` screen pixels wide, and each group is
+merged into one weighted centroid. Every level is bucketed by slippy-map
+tile so a viewport query only touches the tiles it can see.
+"""
+from .models import has_coordinates
+from .projection import lat_to_y, lng_to_x, tile_index, x_to_lng, y_to_lat
+
+DEFAULT_MAX_ZOOM = 16
+DEFAULT_RADIUS_PX = 60
+TILE_SIZE_PX = 256
+
+
+class Cluster:
+    __slots__ = ("x", "y", "count", "expansion_zoom", "location")
+
+    def __init__(self, x, y, count, expansion_zoom, location=None):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.expansion_zoom = expansion_zoom
+        self.location = location
+
+    @property
+    def latitude(self):
+        return self.location["latitude"] if self.location else y_to_lat(self.y)
+
+    @property
+    def longitude(self):
+        return self.location["longitude"] if self.location else x_to_lng(self.x)
+
+    def to_dict(self):
+        if self.location is not None:
+            return {**self.location, "cluster": False, "count": 1}
+        return {
+            "cluster": True,
+            "count": self.count,
+            "latitude": round(self.latitude, 6),
+            "longitude": round(self.longitude, 6),
+            "expansion_zoom": self.expansion_zoom,
+        }
+
+
+class ClusterIndex:
+    """Clusters for every zoom level 0..max_zoom, plus raw points above it"""
+
+    def __init__(self, locations, max_zoom=DEFAULT_MAX_ZOOM, radius_px=DEFAULT_RADIUS_PX):
+        self.max_zoom = max_zoom
+        self.radius_px = radius_px
+        self.levels = {}
+
+        current = []
+        for location in locations:
+            if has_coordinates(location):
+                x, y = lng_to_x(location["longitude"]), lat_to_y(location["latitude"])
+                current.append(Cluster(x, y, 1, max_zoom + 1, location))
+        self.levels[max_zoom + 1] = self._bucket(current, max_zoom)
+
+        for zoom in range(max_zoom, -1, -1):
+            current = self._merge(current, zoom)
+            self.levels[zoom] = self._bucket(current, zoom)
+
+    def _merge(self, clusters, zoom):
+        cell = self.radius_px / (TILE_SIZE_PX * 2 ** zoom)
+        groups = {}
+        for cluster in clusters:
+            groups.setdefault((int(cluster.x / cell), int(cluster.y / cell)), []).append(cluster)
+
+        merged = []
+        for members in groups.values():
+            if len(members) == 1:
+                # Nothing to merge with: the same cluster carries on up a level
+                merged.append(members[0])
+                continue
+            count = sum(member.count for member in members)
+            x = sum(member.x * member.count for member in members) / count
+            y = sum(member.y * member.count for member in members) / count
+            merged.append(Cluster(x, y, count, zoom + 1))
+        return merged
+
+    @staticmethod
+    def _bucket(clusters, zoom):
+        tiles = {}
+        for cluster in clusters:
+            tiles.setdefault(tile_index(cluster.x, cluster.y, zoom), []).append(cluster)
+        return tiles
+
+    def get_clusters(self, west, south, east, north, zoom):
+        """Clusters and single points whose position falls inside the bbox"""
+        level_zoom = max(0, min(int(zoom), self.max_zoom + 1))
+        tiles = self.levels[level_zoom]
+        tile_zoom = min(level_zoom, self.max_zoom)
+
+        min_tx, min_ty = tile_index(lng_to_x(max(-180.0, west)), lat_to_y(north), tile_zoom)
+        max_tx, max_ty = tile_index(lng_to_x(min(180.0, east)), lat_to_y(south), tile_zoom)
+
+        if (max_tx - min_tx + 1) * (max_ty - min_ty + 1) <= len(tiles):
+            candidates = [
+                cluster
+                for tx in range(min_tx, max_tx + 1)
+                for ty in range(min_ty, max_ty + 1)
+                for cluster in tiles.get((tx, ty), ())
+            ]
+        else:
+            # Viewport covers more tiles than are occupied; walk the occupied ones
+            candidates = [
+                cluster
+                for (tx, ty), clusters in tiles.items()
+                if min_tx <= tx <= max_tx and min_ty <= ty <= max_ty
+                for cluster in clusters
+            ]
+
+        return [
+            cluster for cluster in candidates
+            if south <= cluster.latitude <= north and west <= cluster.longitude <= east
+        ]
@@ -0,0 +1,125 @@
+# backend/app/columnar.py
+"""Column-wise encoding of the location list for compact downloads.
+
+Instead of an array of 13-key objects, each field is sent once as a
+column. Low-cardinality strings (retailer, name, state, type, ...) are
+dictionary-encoded as a table of distinct values plus one small integer
+code per row, and coordinates are fixed-point integers (1e-7 degrees,
+about 1 cm) delta-encoded against the previous row, with the indexes of
+NULL coordinates listed separately. The same structure is
+served as JSON or, when the msgpack package is installed, MessagePack.
+"""
+import numpy as np
+
+from .models import COORDINATE_COLUMNS, DICTIONARY_COLUMNS, STRING_COLUMNS
+from .snapshot import Snapshot
+
+try:
+    import msgpack
+except ImportError:  # optional; only ?format=msgpack needs it
+    msgpack = None
+
+# 2: coordinate columns list their null rows in "nulls"
+COLUMNAR_VERSION = 2
+COLUMNAR_JSON_TYPE = "application/vnd.pokemon-vending.columnar+json"
+MSGPACK_TYPE = "application/msgpack"
+
+# Keeps the 7 decimals the geocoders return; values still fit a JS double exactly
+COORDINATE_SCALE = 10_000_000
+
+
+
+def dictionary_encode(values):
+    """Distinct values in first-seen order plus a code per row"""
+    table = {}
+    codes = [table.setdefault(value, len(table)) for value in values]
+    return {"dict": list(table), "codes": codes}
+
+
+def delta_encode(values, scale=COORDINATE_SCALE):
+    """Fixed-point integers, the first absolute and the rest as differences.
+
+    None values are listed by row index in "nulls"; their delta is 0 (they
+    repeat the previous value) so they cost one small integer each.
+    """
+    values = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    nulls = np.flatnonzero(np.isnan(values))
+    if len(nulls):
+        # Carry the last non-null value forward over the gaps
+        last = np.maximum.accumulate(np.where(np.isnan(values), -1, np.arange(len(values))))
+        values = np.where(last >= 0, values[np.maximum(last, 0)], 0.0)
+    fixed = np.rint(values * scale).astype(np.int64)
+    deltas = np.diff(fixed, prepend=0)
+    return {"scale": scale, "deltas": deltas.tolist(), "nulls": nulls.tolist()}
+
+
+def delta_decode(column):
+    """Inverse of delta_encode, as floats (None where the value was null)"""
+    values = (np.cumsum(np.asarray(column["deltas"], dtype=np.int64)) / column["scale"]).tolist()
+    for index in column.get("nulls", ()):
+        values[index] = None
+    return values
+
+
+def encode_columns(locations):
+    """The location list as a columnar dict"""
+    columns = {}
+    for name in STRING_COLUMNS:
+        columns[name] = [location.get(name) for location in locations]
+    for name in DICTIONARY_COLUMNS:
+        columns[name] = dictionary_encode(location.get(name) for location in locations)
+    for name in COORDINATE_COLUMNS:
+        columns[name] = delta_encode([location.get(name) for location in locations])
+    columns["is_active"] = [
+        None if location.get("is_active") is None else int(bool(location["is_active"])) for location in locations
+    ]
+    return {"format": "columnar", "version": COLUMNAR_VERSION, "count": len(locations), "columns": columns}
+
+
+def decode_columns(payload):
+    """Rebuild the row dicts from a columnar payload (used by tests and scripts)"""
+    columns = payload["columns"]
+    decoded = {name: columns[name] for name in STRING_COLUMNS}
+    for name in DICTIONARY_COLUMNS:
+        table = columns[name]["dict"]
+        decoded[name] = [table[code] for code in columns[name]["codes"]]
+    for name in COORDINATE_COLUMNS:
+        decoded[name] = delta_decode(columns[name])
+    decoded["is_active"] = [None if flag is None else bool(flag) for flag in columns["is_active"]]
+    return [{name: values[i] for name, values in decoded.items()} for i in range(payload["count"])]
+
+
+def columnar_json_snapshot(locations):
+    return Snapshot(encode_columns(locations))
+
+
+def msgpack_snapshot(locations):
+    return Snapshot.from_body(msgpack.packb(encode_columns(locations), use_bin_type=True))
+
+
+# ?format= value -> (snapshot artifact name, builder, media type)
+FORMATS = {
+    "json": ("snapshot", Snapshot, "application/json"),
+    "columnar": ("columnar_snapshot", columnar_json_snapshot, COLUMNAR_JSON_TYPE),
+    "msgpack": ("msgpack_snapshot", msgpack_snapshot, MSGPACK_TYPE),
+}
+
+
+def negotiate_format(format_param, accept):
+    """Pick a response format from ?format= or else the Accept header.
+
+    Returns a FORMATS key, or None if the requested format is unknown or
+    unavailable (msgpack not installed).
+    """
+    if format_param:
+        name = format_param.lower()
+    elif accept and (MSGPACK_TYPE in accept or "application/x-msgpack" in accept):
+        name = "msgpack"
+    elif accept and COLUMNAR_JSON_TYPE in accept:
+        name = "columnar"
+    else:
+        name = "json"
+
+    if name not in FORMATS or (name == "msgpack" and msgpack is None):
+        return None
+    return name
@@ -1,15 +1,43 @@
 # backend/app/main.py
+import json
+import os
 import traceback
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-from math import cos, radians
+from typing import List, Optional
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .database import get_db
+from .database import get_async_db, get_db
 from .models import VendingLocation  # ← CHANGED THIS LINE
+from .cache import dataset_cache, register_artifact
+from .clustering import ClusterIndex
+from .columnar import FORMATS, negotiate_format
+from .pagination import clamp_limit, decode_cursor, encode_cursor, parse_fields, stream_ndjson
+from .projection import parse_bbox
+from .search import DEFAULT_LIMIT, MAX_LIMIT, SearchIndex
+from .singleflight import coalescer
+from .spatial import SpatialIndex
+from .stats import stats_snapshot
+from .tiles import TileIndex, is_valid_tile
 
 app = FastAPI()
 
+# Built from the table once per data version (see DatasetCache)
+for artifact, builder, _ in FORMATS.values():
+    register_artifact(artifact, builder)
+register_artifact("spatial_index", SpatialIndex)
+register_artifact("stats", stats_snapshot)
+register_artifact("search", SearchIndex)
+register_artifact("clusters", ClusterIndex)
+register_artifact("tiles", TileIndex)
+
+MAX_ROUTE_POINTS = 5000
+MAX_CORRIDOR_KM = 50
+MAX_RADIUS_KM = 500
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +45,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/")
@@ -35,12 +64,24 @@ async def debug_env():
     }
 
 @app.get("/api/debug-count")
-async def debug_count(db: Session = Depends(get_db)):
-    count = db.query(VendingLocation).count()
+async def debug_count(db: AsyncSession = Depends(get_async_db)):
+    async def count_rows():
+        return await db.scalar(select(func.count()).select_from(VendingLocation))
+
+    count = await coalescer.do(("count",), count_rows)
     return {"total_locations": count}
 
+@app.get("/api/debug-cache")
+async def debug_cache():
+    """Data version, built artifacts and request coalescing counters"""
+    return {
+        "data_version": dataset_cache.version,
+        "artifacts": sorted(dataset_cache.artifacts),
+        "coalescing": coalescer.stats(),
+    }
+
 @app.get("/api/debug-raw")
-async def debug_raw(db: Session = Depends(get_db)):
+def debug_raw(db: Session = Depends(get_db)):
     try:
         result = db.execute("SHOW TABLES;").fetchall()
         return {"tables": [row[0] for row in result]}
@@ -48,23 +89,71 @@ async def debug_raw(db: Session = Depends(get_db)):
         print("DB ERROR:", traceback.format_exc())  # <- full error goes to Railway logs
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@app.get("/api/locations")
-async def get_all_locations(db: Session = Depends(get_db)):
-    """Get all vending machine locations"""
+async def paged_locations(db, fields, limit, cursor, state=None):
+    """Keyset-paginated, projected location list; the next cursor goes in X-Next-Cursor"""
     try:
-        # Using SQLAlchemy ORM approach
-        locations = db.query(VendingLocation).all()  # ← CHANGED HERE
-        return locations
+        columns = parse_fields(fields)
+        page_size = clamp_limit(limit)
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def build_page():
+        # Served from the in-memory store: no query, no ORM objects
+        store = await dataset_cache.get_store(db)
+        rows, last_id = store.page(columns, page_size, after, state)
+        return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), last_id
+
+    try:
+        # Identical concurrent requests share one page build and its encoded body
+        body, last_id = await coalescer.do(("page", state, tuple(columns), page_size, after), build_page)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    headers = {"X-Next-Cursor": encode_cursor(last_id)} if last_id is not None else {}
+    return Response(content=body, media_type="application/json", headers=headers)
 
-@app.get("/api/locations/{state}")
-async def get_locations_by_state(state: str, db: Session = Depends(get_db)):
-    """Get locations for a specific state"""
+def streamed_locations(db, stream, fields, state=None):
+    """NDJSON response read from a server-side cursor as it is sent"""
+    if stream != "ndjson":
+        raise HTTPException(status_code=400, detail="stream must be 'ndjson'")
     try:
-        # Query using SQLAlchemy
-        locations = db.query(VendingLocation).filter(VendingLocation.state == state.upper()).all()  # ← CHANGED HERE
-        return locations
+        columns = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # The request's session stays open until the response has been sent
+    return StreamingResponse(stream_ndjson(db, columns, state), media_type="application/x-ndjson")
+
+@app.get("/api/locations")
+async def get_all_locations(
+    request: Request,
+    format: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all vending machine locations as JSON, or column-wise with ?format=columnar|msgpack.
+
+    With fields=, limit= or cursor= the list is paged by id instead, and
+    stream=ndjson sends every row (optionally projected) as NDJSON.
+    """
+    if stream is not None:
+        return streamed_locations(db, stream, fields)
+    if fields is not None or limit is not None or cursor is not None:
+        if format not in (None, "json"):
+            raise HTTPException(status_code=400, detail="Paging is only available as JSON")
+        return await paged_locations(db, fields, limit, cursor)
+
+    name = negotiate_format(format, request.headers.get("accept"))
+    if name is None:
+        raise HTTPException(status_code=406, detail=f"Unsupported format; use one of {', '.join(FORMATS)}")
+    artifact, _, media_type = FORMATS[name]
+
+    try:
+        # Encoded once per data version, answers If-None-Match with 304
+        snapshot = await dataset_cache.get(artifact, db)
+        return snapshot.response(request, media_type=media_type, vary="Accept, Accept-Encoding")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -72,21 +161,129 @@ async def get_locations_by_state(state: str, db: Session = Depends(get_db)):
 async def get_nearby_locations(
     lat: float, 
     lng: float, 
-    radius_km: int = 10,
-    db: Session = Depends(get_db)
+    radius_km: float = 10,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Find locations near given coordinates"""
+    """Find locations within radius_km of given coordinates, nearest first"""
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=400, detail="lat must be in [-90, 90] and lng in [-180, 180]")
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise HTTPException(status_code=400, detail=f"radius_km must be in (0, {MAX_RADIUS_KM}]")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be >= 1")
+
     try:
-        # Calculate bounding box
-        lat_range = radius_km / 111.0
-        lng_range = radius_km / (111.0 * cos(radians(lat)))
-        
-        # SQLAlchemy query with bounding box
-        locations = db.query(VendingLocation).filter(  # ← CHANGED HERE
-            VendingLocation.latitude.between(lat - lat_range, lat + lat_range),  # ← CHANGED HERE
-            VendingLocation.longitude.between(lng - lng_range, lng + lng_range)  # ← CHANGED HERE
-        ).all()
+        index = await dataset_cache.get("spatial_index", db)
+        if limit is not None:
+            hits = index.nearest(lat, lng, limit, max_radius_km=radius_km)
+        else:
+            hits = index.within_radius(lat, lng, radius_km)
         
-        return locations
+        return [{**location, "distance_km": round(distance, 3)} for distance, location in hits]
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+class RouteQuery(BaseModel):
+    route: List[List[float]]  # [[lat, lng], ...]
+    width_km: float = 5
+    limit: Optional[int] = None
+
+@app.post("/api/route")
+async def get_locations_along_route(query: RouteQuery, db: AsyncSession = Depends(get_async_db)):
+    """Find locations within width_km of a driving route, in the order the route passes them"""
+    if not 2 <= len(query.route) <= MAX_ROUTE_POINTS:
+        raise HTTPException(status_code=400, detail=f"route needs 2 to {MAX_ROUTE_POINTS} points")
+    if any(len(point) != 2 or not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180) for point in query.route):
+        raise HTTPException(status_code=400, detail="route points must be [lat, lng]")
+    if not 0 < query.width_km <= MAX_CORRIDOR_KM:
+        raise HTTPException(status_code=400, detail=f"width_km must be in (0, {MAX_CORRIDOR_KM}]")
+
+    try:
+        index = await dataset_cache.get("spatial_index", db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    try:
+        hits = index.along_route([tuple(point) for point in query.route], query.width_km, query.limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [
+        {**location, "route_km": round(route_km, 3), "distance_km": round(distance, 3)}
+        for route_km, distance, location in hits
+    ]
+
+@app.get("/api/locations/{state}")
+async def get_locations_by_state(
+    state: str,
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get locations for a specific state, at most limit (capped at MAX_PAGE_SIZE) per page"""
+    if stream is not None:
+        return streamed_locations(db, stream, fields, state=state.upper())
+    return await paged_locations(db, fields, limit, cursor, state=state.upper())
+
+@app.get("/api/stats")
+async def get_stats(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Counts per state, retailer and type, with each state's bbox [w, s, e, n] and centroid [lat, lng]"""
+    try:
+        # Computed once per data version, answers If-None-Match with 304
+        snapshot = await dataset_cache.get("stats", db)
+        return snapshot.response(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/search")
+async def search_locations(q: str, limit: int = DEFAULT_LIMIT, db: AsyncSession = Depends(get_async_db)):
+    """Typeahead search by retailer, city, address, zip or machine ID prefixes, best match first"""
+    if not 1 <= limit <= MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_LIMIT}")
+
+    try:
+        index = await dataset_cache.get("search", db)
+        return [{**location, "score": score} for score, location in index.search(q, limit)]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/api/clusters")
+async def get_clusters(bbox: str, zoom: int, db: AsyncSession = Depends(get_async_db)):
+    """Get marker clusters visible in a west,south,east,north viewport at a zoom level"""
+    try:
+        west, south, east, north = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {str(e)}")
+    if zoom < 0:
+        raise HTTPException(status_code=400, detail="zoom must be >= 0")
+
+    try:
+        index = await dataset_cache.get("clusters", db)
+        return [cluster.to_dict() for cluster in index.get_clusters(west, south, east, north, zoom)]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/tiles/{z}/{x}/{y}")
+async def get_tile(z: int, x: int, y: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get the locations inside slippy-map tile z/x/y as compact JSON"""
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    try:
+        tiles = await dataset_cache.get("tiles", db)
+        tile = tiles.get_tile(z, x, y)
+        return tile.response(request, max_age=3600)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/api/admin/invalidate")
+async def invalidate_cache(x_admin_token: str = Header(None)):
+    """Reload the table and drop cached results on the next request (called by the import script)"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token or x_admin_token != admin_token:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    dataset_cache.invalidate()
+    coalescer.clear()
+    return {"invalidated": True}
\ No newline at end of file
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, String, Boolean, Date, Numeric
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Column, String, Boolean, Date, Index, Numeric
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 class VendingLocation(Base):
     __tablename__ = "vending_locations"
+    # Kept in step with backend/migrations. On MySQL, migration 0003 also adds
+    # a generated `location` POINT SRID 4326 column with a SPATIAL INDEX; it
+    # isn't mapped here since SQLite has no equivalent.
+    __table_args__ = (
+        Index("ix_vending_locations_state", "state"),
+        Index("ix_vending_locations_lat_lng", "latitude", "longitude"),
+    )
 
     id = Column(String(50), primary_key=True, index=True)
     retailer = Column(String(100))
@@ -19,3 +29,32 @@ class VendingLocation(Base):
     type = Column(String(50))
     last_verified = Column(Date)
     is_active = Column(Boolean)
+
+
+# Column names in table order, as exposed by the API
+LOCATION_FIELDS = [column.name for column in VendingLocation.__table__.columns]
+
+# How the read path holds each column; the LocationStore arrays and the
+# columnar payload both follow this split
+DICTIONARY_COLUMNS = ["retailer", "name", "city", "state", "zip_code", "type", "last_verified"]
+STRING_COLUMNS = ["id", "machine_id", "address"]
+COORDINATE_COLUMNS = ["latitude", "longitude"]
+
+# Rows the API serves: the import deactivates machines that disappeared
+# instead of deleting them. NULL (rows from older dumps) counts as active.
+ACTIVE_ROWS = VendingLocation.is_active.isnot(False)
+
+
+def has_coordinates(location):
+    """False for rows that were never geocoded (NULL or 0, 0 coordinates)"""
+    lat, lng = location.get("latitude"), location.get("longitude")
+    return lat is not None and lng is not None and not (lat == 0.0 and lng == 0.0)
+
+
+def json_value(value):
+    """Convert a column value to its JSON form (Decimal -> float, date -> ISO string)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
@@ -0,0 +1,88 @@
+# backend/app/pagination.py
+"""Keyset pagination, column projection and NDJSON streaming for the location lists.
+
+Pages are ordered by id and continue from an opaque cursor holding the
+last id served, so a page costs the same however deep the client pages
+(see LocationStore.page). Streams select only the requested columns.
+"""
+import base64
+import binascii
+import json
+import os
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import ACTIVE_ROWS, LOCATION_FIELDS, VendingLocation, json_value
+
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+
+def parse_fields(fields):
+    """Column names from a comma-separated fields= value; all columns if empty.
+
+    `id` is always included since the cursor is built from it.
+    """
+    if not fields:
+        return list(LOCATION_FIELDS)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in LOCATION_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    # Keep table order and drop repeats
+    return [name for name in LOCATION_FIELDS if name == "id" or name in requested]
+
+
+def clamp_limit(limit):
+    """Page size: MAX_PAGE_SIZE when not given, capped at MAX_PAGE_SIZE"""
+    if limit is None:
+        return MAX_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+URLSAFE_TO_STANDARD = str.maketrans("-_", "+/")
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(last_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """The last id served, from a cursor made by encode_cursor"""
+    # urlsafe_b64decode silently drops characters outside the alphabet, so
+    # map to the standard alphabet and decode strictly instead
+    if "+" in cursor or "/" in cursor:
+        raise ValueError("malformed cursor")
+    try:
+        standard = cursor.translate(URLSAFE_TO_STANDARD) + "=" * (-len(cursor) % 4)
+        last_id = base64.b64decode(standard, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("malformed cursor")
+    if not last_id:
+        raise ValueError("malformed cursor")
+    return last_id
+
+
+STREAM_BATCH_SIZE = 500
+
+
+async def stream_ndjson(db: AsyncSession, fields, state=None, batch_size=None):
+    """Yield the selected fields of every active location as NDJSON lines, in id order.
+
+    Rows come from a server-side cursor `batch_size` at a time, so memory
+    stays flat and the first bytes go out before the query finishes.
+    """
+    columns = [getattr(VendingLocation, name) for name in fields]
+    batch_size = batch_size or STREAM_BATCH_SIZE
+    query = select(*columns).where(ACTIVE_ROWS).order_by(VendingLocation.id).execution_options(yield_per=batch_size)
+    if state is not None:
+        query = query.where(VendingLocation.state == state)
+
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield "".join(
+            json.dumps({name: json_value(value) for name, value in zip(fields, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode("utf-8")
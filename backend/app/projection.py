@@ -0,0 +1,60 @@
+# backend/app/projection.py
+"""Web Mercator helpers shared by clustering and map tiles.
+
+Projected coordinates are normalized to [0, 1] in both axes, with (0, 0)
+at the north-west corner, so the slippy-map tile at zoom z holding a
+point is simply floor(x * 2**z), floor(y * 2**z).
+"""
+from math import atan, exp, log, pi, sin
+
+MAX_LATITUDE = 85.0511287798
+
+
+def lng_to_x(lng):
+    return lng / 360.0 + 0.5
+
+
+def lat_to_y(lat):
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    s = sin(lat * pi / 180.0)
+    y = 0.5 - 0.25 * log((1 + s) / (1 - s)) / pi
+    return min(1.0, max(0.0, y))
+
+
+def x_to_lng(x):
+    return (x - 0.5) * 360.0
+
+
+def y_to_lat(y):
+    y2 = (180.0 - y * 360.0) * pi / 180.0
+    return 360.0 * atan(exp(y2)) / pi - 90.0
+
+
+def tile_index(x, y, zoom):
+    """Slippy-map (tile_x, tile_y) containing the projected point"""
+    n = 2 ** zoom
+    return min(n - 1, int(x * n)), min(n - 1, int(y * n))
+
+
+def tile_bounds(zoom, tile_x, tile_y):
+    """(west, south, east, north) in degrees for a slippy-map tile"""
+    n = 2 ** zoom
+    return (
+        x_to_lng(tile_x / n),
+        y_to_lat((tile_y + 1) / n),
+        x_to_lng((tile_x + 1) / n),
+        y_to_lat(tile_y / n),
+    )
+
+
+def parse_bbox(bbox):
+    """Parse 'west,south,east,north' into floats, raising ValueError if malformed"""
+    parts = [float(part) for part in bbox.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be west,south,east,north")
+    west, south, east, north = parts
+    if south > north:
+        raise ValueError("bbox south must not exceed north")
+    if not (-90 <= south <= 90 and -90 <= north <= 90):
+        raise ValueError("bbox latitudes must be within [-90, 90]")
+    return west, south, east, north
@@ -0,0 +1,85 @@
+# backend/app/search.py
+"""In-memory typeahead index over location text fields.
+
+Every word of the indexed fields is stored under each of its prefixes
+(edge n-grams), so a prefix query is a dict lookup per query word and an
+intersection of small posting lists, with no LIKE scans in the database.
+The index is a dataset_cache artifact and is rebuilt with the data version.
+"""
+import heapq
+import re
+
+# Field -> weight of a match in that field
+FIELD_WEIGHTS = {
+    "machine_id": 5.0,
+    "retailer": 3.0,
+    "name": 3.0,
+    "city": 2.0,
+    "state": 1.5,
+    "zip_code": 1.5,
+    "address": 1.0,
+}
+# A query word matching a whole word scores this much more than a prefix
+EXACT_BONUS = 2.0
+# Longer prefixes aren't indexed; longer query words are checked against the word itself
+MAX_PREFIX = 12
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN.findall((text or "").lower())
+
+
+class SearchIndex:
+    """Prefix -> {location position: score} postings over the location list"""
+
+    def __init__(self, locations):
+        self.locations = locations
+        self.postings = {}
+        self.words = []  # per location: set of full words, to confirm long query words
+
+        for position, location in enumerate(locations):
+            words = set()
+            for field, weight in FIELD_WEIGHTS.items():
+                for word in tokenize(location.get(field)):
+                    words.add(word)
+                    for length in range(1, min(len(word), MAX_PREFIX) + 1):
+                        score = weight * (EXACT_BONUS if length == len(word) else 1.0)
+                        posting = self.postings.setdefault(word[:length], {})
+                        if score > posting.get(position, 0.0):
+                            posting[position] = score
+            self.words.append(words)
+
+    def _matches(self, word):
+        """{position: score} of locations with a word starting with `word`"""
+        posting = self.postings.get(word[:MAX_PREFIX], {})
+        if len(word) <= MAX_PREFIX:
+            return posting
+        # Prefix longer than indexed: confirm against the stored words
+        return {
+            position: score for position, score in posting.items()
+            if any(candidate.startswith(word) for candidate in self.words[position])
+        }
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Locations matching every word of `query` as a prefix, best first.
+
+        Returns a list of (score, location) tuples.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+
+        postings = sorted((self._matches(word) for word in words), key=len)
+        scores = dict(postings[0])
+        for posting in postings[1:]:
+            scores = {position: score + posting[position] for position, score in scores.items() if position in posting}
+            if not scores:
+                return []
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self.locations[item[0]]["id"]))
+        return [(score, self.locations[position]) for position, score in ranked]
@@ -0,0 +1,88 @@
+# backend/app/singleflight.py
+"""Coalescing of identical concurrent requests.
+
+When many clients ask for the same thing at once (a traffic spike after a
+social media post), only the first request starts the computation, in a
+task of its own that every caller awaits. The result is then kept for a
+short TTL so the tail of the spike is served from memory too.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+RESULT_CACHE_SECONDS = float(os.getenv("RESULT_CACHE_SECONDS", "2"))
+RESULT_CACHE_ENTRIES = 1024
+
+
+class SingleFlight:
+    """Run one computation per key at a time and share its result"""
+
+    def __init__(self, ttl=RESULT_CACHE_SECONDS, max_entries=RESULT_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight = {}
+        self._results = OrderedDict()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def do(self, key, compute):
+        """Return compute()'s result for `key`, sharing it with concurrent and recent callers"""
+        self.calls += 1
+
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self.cache_hits += 1
+                self._results.move_to_end(key)
+                return cached[1]
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._run(key, compute))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+            self.executions += 1
+        # Shield: a caller going away (the first one included) must not
+        # cancel the shared work or fail the others waiting on it
+        return await asyncio.shield(task)
+
+    async def _run(self, key, compute):
+        try:
+            value = await compute()
+        finally:
+            del self._inflight[key]
+        if self.ttl > 0:
+            self._results[key] = (time.monotonic() + self.ttl, value)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop cached results (in-flight work still completes)"""
+        self._results.clear()
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "saved": self.coalesced + self.cache_hits,
+            "in_flight": len(self._inflight),
+            "cached_results": len(self._results),
+        }
+
+
+def _retrieve_exception(task):
+    """Mark a failure as seen when every caller had already gone away"""
+    if not task.cancelled():
+        task.exception()
+
+
+coalescer = SingleFlight()
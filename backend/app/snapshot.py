@@ -0,0 +1,57 @@
+# backend/app/snapshot.py
+"""Pre-encoded response bodies for the full location list.
+
+The /api/locations payload is identical for every visitor until the data
+changes, so it is serialized and gzip-compressed once per data version and
+served as raw bytes with an ETag.
+"""
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+
+class Snapshot:
+    """An encoded JSON payload with its gzip form and ETag"""
+
+    def __init__(self, payload):
+        self._set_body(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_body(cls, body: bytes):
+        """A snapshot of an already-encoded (e.g. binary) body"""
+        snapshot = cls.__new__(cls)
+        snapshot._set_body(body)
+        return snapshot
+
+    def _set_body(self, body):
+        self.body = body
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+    def response(self, request: Request, media_type="application/json", max_age=60,
+                 vary="Accept-Encoding") -> Response:
+        """Build a 200/304 response for this snapshot honoring the request headers"""
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={max_age}",
+            "Vary": vary,
+        }
+
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type=media_type, headers=headers)
+        return Response(content=self.body, media_type=media_type, headers=headers)
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header covers the given ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Compare weakly: proxies may re-tag compressed bodies as W/"..."
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
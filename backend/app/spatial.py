@@ -0,0 +1,253 @@
+# backend/app/spatial.py
+"""In-memory spatial index for vending machine locations.
+
+Locations are bucketed into a fixed lat/lng grid (like a geohash grid), so
+radius and k-nearest queries only look at the cells around the query point
+instead of the whole table. Distances are exact haversine distances.
+"""
+import heapq
+from math import asin, ceil, cos, floor, radians, sin, sqrt
+
+from .models import has_coordinates
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.195
+
+# ~28 km tall cells: a 10 km radius query touches at most 9 cells
+DEFAULT_CELL_DEG = 0.25
+
+# Cell-sized route pieces searched per corridor query (a coast-to-coast
+# drive is a few hundred); bounds the work a single request can cause
+MAX_ROUTE_PIECES = 20_000
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometers"""
+    dlat = radians(lat2 - lat1)
+    dlng = radians(lng2 - lng1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+class SpatialIndex:
+    """Grid index over location dicts that have `latitude` / `longitude`"""
+
+    def __init__(self, locations, cell_deg=DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.cells = {}
+        self.size = 0
+
+        for location in locations:
+            # Skip rows that were never geocoded
+            if not has_coordinates(location):
+                continue
+            lat, lng = location["latitude"], location["longitude"]
+            self.cells.setdefault(self._cell(lat, lng), []).append((lat, lng, location))
+            self.size += 1
+
+        # Cell extent, so searches never walk cells outside the occupied grid
+        self.extent = None
+        if self.cells:
+            rows = [row for row, _ in self.cells]
+            cols = [col for _, col in self.cells]
+            self.extent = (min(rows), max(rows), min(cols), max(cols))
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, lat, lng):
+        return floor(lat / self.cell_deg), floor(lng / self.cell_deg)
+
+    def _clamp(self, row_min, row_max, col_min, col_max):
+        """Intersect a cell range with the occupied extent; None if they don't overlap"""
+        if self.extent is None:
+            return None
+        ext_row_min, ext_row_max, ext_col_min, ext_col_max = self.extent
+        row_min, row_max = max(row_min, ext_row_min), min(row_max, ext_row_max)
+        col_min, col_max = max(col_min, ext_col_min), min(col_max, ext_col_max)
+        if row_min > row_max or col_min > col_max:
+            return None
+        return row_min, row_max, col_min, col_max
+
+    def _cells_in_range(self, row_min, row_max, col_min, col_max):
+        """Occupied cells in a range, without visiting more cells than are occupied"""
+        clamped = self._clamp(row_min, row_max, col_min, col_max)
+        if clamped is None:
+            return
+        row_min, row_max, col_min, col_max = clamped
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self.cells):
+            # Range covers more cells than are occupied; walk the occupied ones
+            for (row, col) in self.cells:
+                if row_min <= row <= row_max and col_min <= col <= col_max:
+                    yield row, col
+            return
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                if (row, col) in self.cells:
+                    yield row, col
+
+    def _points_in_cells(self, row_min, row_max, col_min, col_max):
+        for cell in self._cells_in_range(row_min, row_max, col_min, col_max):
+            yield from self.cells[cell]
+
+    def within_radius(self, lat, lng, radius_km, limit=None):
+        """Locations within `radius_km` of (lat, lng), nearest first.
+
+        Returns a list of (distance_km, location) tuples.
+        """
+        lat_range = radius_km / KM_PER_DEG_LAT
+        # Widest longitude span of the circle is at its pole-ward edge
+        edge_lat = min(89.9, abs(lat) + lat_range)
+        lng_range = radius_km / (KM_PER_DEG_LAT * cos(radians(edge_lat)))
+
+        row_min, col_min = self._cell(lat - lat_range, lng - lng_range)
+        row_max, col_max = self._cell(lat + lat_range, lng + lng_range)
+
+        hits = []
+        for p_lat, p_lng, location in self._points_in_cells(row_min, row_max, col_min, col_max):
+            distance = haversine_km(lat, lng, p_lat, p_lng)
+            if distance <= radius_km:
+                hits.append((distance, location))
+
+        if limit is not None:
+            return heapq.nsmallest(limit, hits, key=lambda hit: hit[0])
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+    def nearest(self, lat, lng, k, max_radius_km=None):
+        """The `k` locations closest to (lat, lng), nearest first.
+
+        Searches rings of cells outward from the query cell and stops once no
+        unvisited cell can hold anything closer than the current k-th hit.
+        """
+        if k <= 0 or not self.size:
+            return []
+
+        center_row, center_col = self._cell(lat, lng)
+        row_min, row_max, col_min, col_max = self.extent
+        max_ring = max(
+            abs(center_row - row_min), abs(center_row - row_max),
+            abs(center_col - col_min), abs(center_col - col_max),
+        )
+
+        best = []  # max-heap of (-distance, tiebreak, location)
+        for ring in range(max_ring + 1):
+            for p_lat, p_lng, location in self._ring_points(center_row, center_col, ring):
+                distance = haversine_km(lat, lng, p_lat, p_lng)
+                if max_radius_km is not None and distance > max_radius_km:
+                    continue
+                entry = (-distance, id(location), location)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, entry)
+
+            bound = self._outside_bound_km(lat, lng, center_row, center_col, ring)
+            if max_radius_km is not None and bound > max_radius_km:
+                break
+            if len(best) == k and -best[0][0] <= bound:
+                break
+
+        return sorted(((-neg, location) for neg, _, location in best), key=lambda hit: hit[0])
+
+    def along_route(self, route, width_km, limit=None):
+        """Locations within `width_km` of a polyline, in the order the route passes them.
+
+        `route` is a list of (lat, lng) points. Each segment is split into
+        pieces no longer than a cell, and only the cells within width_km of
+        a piece are searched, so a long route looks at the grid around it
+        rather than the whole table. Returns a list of
+        (route_km, distance_km, location) tuples, where route_km is the
+        distance along the route to the closest approach. Raises ValueError
+        if the route would need more than MAX_ROUTE_PIECES pieces near the data.
+        """
+        # Segments that pass near occupied cells at all, and how finely to split them
+        near = []
+        for seg, ((lat1, lng1), (lat2, lng2)) in enumerate(zip(route, route[1:])):
+            if self._corridor_cells(lat1, lng1, lat2, lng2, width_km) is not None:
+                near.append((seg, max(1, ceil(max(abs(lat2 - lat1), abs(lng2 - lng1)) / self.cell_deg))))
+        if sum(pieces for _, pieces in near) > MAX_ROUTE_PIECES:
+            raise ValueError(f"route crosses more than {MAX_ROUTE_PIECES} grid cells near the data")
+
+        # Candidate cells -> segments passing near them
+        cell_segments = {}
+        for seg, pieces in near:
+            (lat1, lng1), (lat2, lng2) = route[seg], route[seg + 1]
+            for piece in range(pieces):
+                cells = self._corridor_cells(
+                    lat1 + (lat2 - lat1) * piece / pieces, lng1 + (lng2 - lng1) * piece / pieces,
+                    lat1 + (lat2 - lat1) * (piece + 1) / pieces, lng1 + (lng2 - lng1) * (piece + 1) / pieces,
+                    width_km,
+                )
+                if cells is not None:
+                    for cell in self._cells_in_range(*cells):
+                        cell_segments.setdefault(cell, set()).add(seg)
+
+        # Route distance at the start of each segment
+        offsets = [0.0]
+        for (lat1, lng1), (lat2, lng2) in zip(route, route[1:]):
+            offsets.append(offsets[-1] + haversine_km(lat1, lng1, lat2, lng2))
+
+        hits = []
+        for cell, segments in cell_segments.items():
+            for p_lat, p_lng, location in self.cells[cell]:
+                best = None
+                for seg in sorted(segments):
+                    distance, t = _segment_distance_km(p_lat, p_lng, route[seg], route[seg + 1])
+                    if distance <= width_km and (best is None or distance < best[1]):
+                        best = (offsets[seg] + t * (offsets[seg + 1] - offsets[seg]), distance)
+                if best is not None:
+                    hits.append((best[0], best[1], location))
+
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return hits[:limit] if limit is not None else hits
+
+    def _corridor_cells(self, a_lat, a_lng, b_lat, b_lng, width_km):
+        """Occupied-extent cell range within width_km of segment a-b's bbox, or None"""
+        lat_range = width_km / KM_PER_DEG_LAT
+        edge_lat = min(89.9, max(abs(a_lat), abs(b_lat)) + lat_range)
+        lng_range = width_km / (KM_PER_DEG_LAT * cos(radians(edge_lat)))
+        row_min, col_min = self._cell(min(a_lat, b_lat) - lat_range, min(a_lng, b_lng) - lng_range)
+        row_max, col_max = self._cell(max(a_lat, b_lat) + lat_range, max(a_lng, b_lng) + lng_range)
+        return self._clamp(row_min, row_max, col_min, col_max)
+
+    def _ring_points(self, center_row, center_col, ring):
+        if ring == 0:
+            yield from self.cells.get((center_row, center_col), ())
+            return
+        for col in range(center_col - ring, center_col + ring + 1):
+            yield from self.cells.get((center_row - ring, col), ())
+            yield from self.cells.get((center_row + ring, col), ())
+        for row in range(center_row - ring + 1, center_row + ring):
+            yield from self.cells.get((row, center_col - ring), ())
+            yield from self.cells.get((row, center_col + ring), ())
+
+    def _outside_bound_km(self, lat, lng, center_row, center_col, ring):
+        """Lower bound on the distance to any point outside the searched square"""
+        south = (center_row - ring) * self.cell_deg
+        north = (center_row + ring + 1) * self.cell_deg
+        west = (center_col - ring) * self.cell_deg
+        east = (center_col + ring + 1) * self.cell_deg
+
+        lat_gap_km = min(lat - south, north - lat) * KM_PER_DEG_LAT
+        # Longitude degrees are shortest at the pole-ward edge of the square
+        edge_lat = min(89.9, max(abs(south), abs(north)))
+        lng_gap_km = min(lng - west, east - lng) * KM_PER_DEG_LAT * cos(radians(edge_lat))
+
+        return min(lat_gap_km, lng_gap_km)
+
+
+def _segment_distance_km(lat, lng, start, end):
+    """Distance from a point to a segment, and the 0..1 position of the closest point.
+
+    Uses an equirectangular projection centred on the point, which is
+    accurate to well under a percent for corridor-sized distances.
+    """
+    scale_x = KM_PER_DEG_LAT * cos(radians(lat))
+    ax, ay = (start[1] - lng) * scale_x, (start[0] - lat) * KM_PER_DEG_LAT
+    bx, by = (end[1] - lng) * scale_x, (end[0] - lat) * KM_PER_DEG_LAT
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / length_sq))
+    cx, cy = ax + t * dx, ay + t * dy
+    return sqrt(cx * cx + cy * cy), t
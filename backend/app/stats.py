@@ -0,0 +1,51 @@
+# backend/app/stats.py
+"""Aggregate statistics over the location list.
+
+Counts per state, retailer and type plus each state's bounding box and
+centroid, computed once per data version (it is a dataset_cache artifact)
+so filters and overviews can render without the full dataset.
+"""
+from collections import Counter
+
+import numpy as np
+
+from .models import has_coordinates
+from .snapshot import Snapshot
+
+
+def build_stats(locations):
+    """Summary dict of the location list"""
+    by_state = {}
+    for location in locations:
+        by_state.setdefault(location.get("state") or "", []).append(location)
+
+    states = {}
+    for state in sorted(by_state):
+        members = by_state[state]
+        entry = {
+            "count": len(members),
+            "bbox": None,
+            "centroid": None,
+        }
+        located = [location for location in members if has_coordinates(location)]
+        if located:
+            lats = np.array([location["latitude"] for location in located], dtype=np.float64)
+            lngs = np.array([location["longitude"] for location in located], dtype=np.float64)
+            entry["bbox"] = [float(lngs.min()), float(lats.min()), float(lngs.max()), float(lats.max())]
+            entry["centroid"] = [round(float(lats.mean()), 6), round(float(lngs.mean()), 6)]
+        states[state] = entry
+
+    def counts(field):
+        counter = Counter(location.get(field) or "" for location in locations)
+        return dict(sorted(counter.items(), key=lambda item: (-item[1], item[0])))
+
+    return {
+        "total": len(locations),
+        "states": states,
+        "retailers": counts("retailer"),
+        "types": counts("type"),
+    }
+
+
+def stats_snapshot(locations):
+    return Snapshot(build_stats(locations))
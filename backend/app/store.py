@@ -0,0 +1,98 @@
+# backend/app/store.py
+"""Read-optimized, array-backed copy of the vending_locations table.
+
+Rows are loaded once per data version with a Core query that casts the
+coordinates to floats in SQL, so no ORM instances or Decimals are built.
+Coordinates live in NumPy float64 arrays, low-cardinality strings are
+dictionary-encoded (a value table plus an int32 code per row) and the
+remaining strings are interned. Rows are kept sorted by id, which lets the
+list endpoints page with a bisect instead of a query.
+"""
+import sys
+from bisect import bisect_right
+
+import numpy as np
+
+from .models import COORDINATE_COLUMNS, DICTIONARY_COLUMNS, LOCATION_FIELDS, STRING_COLUMNS, json_value
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class LocationStore:
+    """Column arrays for every location, sorted by id"""
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: row["id"])
+        self.size = len(rows)
+
+        self.strings = {name: [_intern(json_value(row[name])) for row in rows] for name in STRING_COLUMNS}
+        self.ids = self.strings["id"]
+
+        self.codes = {}
+        self.values = {}
+        for name in DICTIONARY_COLUMNS:
+            table = {}
+            self.codes[name] = np.fromiter(
+                (table.setdefault(json_value(row[name]), len(table)) for row in rows),
+                dtype=np.int32, count=self.size,
+            )
+            self.values[name] = list(table)
+
+        self.floats = {
+            name: np.array([np.nan if row[name] is None else row[name] for row in rows], dtype=np.float64)
+            for name in COORDINATE_COLUMNS
+        }
+        # 1/0, or -1 for NULL (older rows, served as active and returned as null)
+        self.is_active = np.array(
+            [-1 if row["is_active"] is None else int(bool(row["is_active"])) for row in rows], dtype=np.int8,
+        )
+
+    def __len__(self):
+        return self.size
+
+    def value(self, name, position):
+        """One field of one row, as it appears in the JSON output"""
+        if name in self.strings:
+            return self.strings[name][position]
+        if name in self.codes:
+            return self.values[name][self.codes[name][position]]
+        if name in self.floats:
+            value = self.floats[name][position]
+            return None if np.isnan(value) else float(value)
+        flag = self.is_active[position]
+        return None if flag < 0 else bool(flag)
+
+    def row(self, position, fields=LOCATION_FIELDS):
+        return {name: self.value(name, position) for name in fields}
+
+    def to_dicts(self):
+        """Every row as a new dict, for the artifact builders (not kept by the store)"""
+        return [self.row(position) for position in range(self.size)]
+
+    def state_positions(self, state):
+        """Positions (in id order) of the rows in `state`"""
+        try:
+            code = self.values["state"].index(state)
+        except ValueError:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.codes["state"] == code)
+
+    def page(self, fields, limit, after=None, state=None):
+        """Up to `limit` rows with id > `after`, optionally in one state.
+
+        Returns (rows as dicts of `fields`, id of the last row or None if
+        this is the last page), the same contract as the SQL keyset query.
+        """
+        start = bisect_right(self.ids, after) if after is not None else 0
+        if state is not None:
+            positions = self.state_positions(state)
+            positions = positions[np.searchsorted(positions, start):]
+        else:
+            positions = np.arange(start, self.size)
+
+        taken = positions[:limit + 1]
+        rows = [self.row(int(position), fields) for position in taken[:limit]]
+        last_id = self.ids[int(taken[limit - 1])] if len(taken) > limit else None
+        return rows, last_id
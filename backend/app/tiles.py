@@ -0,0 +1,88 @@
+# backend/app/tiles.py
+"""Slippy-map JSON tiles of vending machine locations.
+
+Points are sorted by the Morton (quadkey) code of their tile at BASE_ZOOM,
+so every tile at zoom <= BASE_ZOOM owns one contiguous run of that list and
+is found with two binary searches. Encoded tiles are kept in an LRU cache;
+the whole TileIndex is rebuilt when the data version changes.
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+
+from .models import has_coordinates
+from .projection import lat_to_y, lng_to_x, tile_index
+from .snapshot import Snapshot
+
+BASE_ZOOM = 16
+MAX_ZOOM = 22
+DEFAULT_CACHE_SIZE = 2048
+
+TILE_FIELDS = ["id", "retailer", "machine_id", "name", "address", "city", "state", "type"]
+
+
+def morton(tile_x, tile_y):
+    """Interleave the bits of tile x/y (x in the even bits)"""
+    code = 0
+    for bit in range(MAX_ZOOM):
+        code |= ((tile_x >> bit) & 1) << (2 * bit)
+        code |= ((tile_y >> bit) & 1) << (2 * bit + 1)
+    return code
+
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+class TileIndex:
+    """Locations bucketed by tile, with an LRU cache of encoded tiles"""
+
+    def __init__(self, locations, cache_size=DEFAULT_CACHE_SIZE):
+        points = []
+        for location in locations:
+            if not has_coordinates(location):
+                continue
+            x, y = lng_to_x(location["longitude"]), lat_to_y(location["latitude"])
+            points.append((morton(*tile_index(x, y, BASE_ZOOM)), x, y, location))
+        points.sort(key=lambda point: point[0])
+
+        self.codes = [point[0] for point in points]
+        self.points = points
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def locations_in_tile(self, z, x, y):
+        """Locations whose position falls inside tile z/x/y"""
+        base_z = min(z, BASE_ZOOM)
+        shift = 2 * (BASE_ZOOM - base_z)
+        base_x, base_y = x >> (z - base_z), y >> (z - base_z)
+        start = morton(base_x, base_y) << shift
+        end = (morton(base_x, base_y) + 1) << shift
+
+        run = self.points[bisect_left(self.codes, start):bisect_left(self.codes, end)]
+        if z <= BASE_ZOOM:
+            return [point[3] for point in run]
+        # Deeper than the sort key: check the exact tile of each candidate
+        return [point[3] for point in run if tile_index(point[1], point[2], z) == (x, y)]
+
+    def get_tile(self, z, x, y) -> Snapshot:
+        """Encoded tile z/x/y, served from the LRU cache when possible"""
+        key = (z, x, y)
+        tile = self.cache.get(key)
+        if tile is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return tile
+
+        self.misses += 1
+        rows = [
+            [round(loc["latitude"], 6), round(loc["longitude"], 6)] + [loc.get(field) for field in TILE_FIELDS]
+            for loc in self.locations_in_tile(z, x, y)
+        ]
+        tile = Snapshot({"z": z, "x": x, "y": y, "fields": ["latitude", "longitude"] + TILE_FIELDS, "rows": rows})
+
+        self.cache[key] = tile
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return tile
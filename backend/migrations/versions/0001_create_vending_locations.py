@@ -0,0 +1,43 @@
+"""Create vending_locations
+
+Baseline schema, identical to vending_machine_backup.sql. Databases
+restored from that dump already have the table and only get the
+revision recorded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Offline (--sql) runs can't inspect the database; always emit the DDL
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("vending_locations"):
+        return
+    op.create_table(
+        "vending_locations",
+        sa.Column("id", sa.String(50), primary_key=True),
+        sa.Column("retailer", sa.String(100)),
+        sa.Column("machine_id", sa.String(50)),
+        sa.Column("name", sa.String(100)),
+        sa.Column("address", sa.String(200)),
+        sa.Column("city", sa.String(100)),
+        sa.Column("state", sa.String(10)),
+        sa.Column("zip_code", sa.String(20)),
+        sa.Column("latitude", sa.Numeric(10, 8)),
+        sa.Column("longitude", sa.Numeric(11, 8)),
+        sa.Column("type", sa.String(50)),
+        sa.Column("last_verified", sa.Date),
+        sa.Column("is_active", sa.Boolean),
+    )
+
+
+def downgrade():
+    op.drop_table("vending_locations")
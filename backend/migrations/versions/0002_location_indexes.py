@@ -0,0 +1,25 @@
+"""Index state and (latitude, longitude)
+
+State filters and bounding-box queries scanned the whole table; these
+B-tree indexes work on every backend, SQLite included.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-02-01
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_vending_locations_state", "vending_locations", ["state"])
+    op.create_index("ix_vending_locations_lat_lng", "vending_locations", ["latitude", "longitude"])
+
+
+def downgrade():
+    op.drop_index("ix_vending_locations_lat_lng", table_name="vending_locations")
+    op.drop_index("ix_vending_locations_state", table_name="vending_locations")
@@ -0,0 +1,37 @@
+"""MySQL: POINT SRID 4326 column with a SPATIAL INDEX
+
+Adds `location`, a stored generated POINT kept in sync with latitude /
+longitude by MySQL itself, so the import script and the ORM never write
+it. MySQL 8 only; on other backends (SQLite) this revision is a no-op and
+bounding boxes use ix_vending_locations_lat_lng instead.
+
+WKT for SRID 4326 is read in the SRS axis order, latitude first.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-02-01
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "mysql":
+        return
+    op.execute(
+        "ALTER TABLE vending_locations ADD COLUMN location POINT SRID 4326 "
+        "GENERATED ALWAYS AS (ST_PointFromText(CONCAT('POINT(', "
+        "COALESCE(latitude, 0), ' ', COALESCE(longitude, 0), ')'), 4326)) STORED NOT NULL"
+    )
+    op.execute("ALTER TABLE vending_locations ADD SPATIAL INDEX sx_vending_locations_location (location)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "mysql":
+        return
+    op.execute("ALTER TABLE vending_locations DROP INDEX sx_vending_locations_location")
+    op.execute("ALTER TABLE vending_locations DROP COLUMN location")
@@ -27,11 +27,53 @@ async function initMap() {
   // NOTE: search bar removed per request, so no keypress listener
 }
 
-// Load all locations from API
+// Static copies of the API payloads, built by scripts/build_static_artifacts.py
+// and served by Firebase Hosting next to this file (null if not deployed)
+async function loadManifest() {
+  try {
+    const response = await fetch('data/manifest.json', { cache: 'no-cache' });
+    return response.ok ? await response.json() : null;
+  } catch (error) {
+    return null;
+  }
+}
+
+// Fetch a manifest entry, preferring its gzip variant when the browser can inflate it
+async function fetchArtifact(entry) {
+  if (entry.gzip && typeof DecompressionStream !== 'undefined') {
+    const response = await fetch(`data/${entry.gzip.path}`);
+    if (response.ok) {
+      return new Response(response.body.pipeThrough(new DecompressionStream('gzip'))).json();
+    }
+  }
+  const response = await fetch(`data/${entry.path}`);
+  if (!response.ok) throw new Error(`${entry.path}: HTTP ${response.status}`);
+  return response.json();
+}
+
+// Load all locations, from the static artifacts if present, else from the API
 async function loadLocations() {
   try {
-    const response = await fetch('https://pokemon-backend-1080761631887.us-central1.run.app/api/locations');
-    allLocations = await response.json();
+    const manifest = await loadManifest();
+    let payload = null;
+    let statsLoaded;
+    if (manifest) {
+      statsLoaded = fetchArtifact(manifest.stats)
+        .then(stats => { locationStats = stats; })
+        .catch(loadStats);
+      payload = await fetchArtifact(manifest.locations).catch(error => {
+        console.error('Error loading static locations, falling back to the API:', error);
+        return null;
+      });
+    } else {
+      statsLoaded = loadStats();
+    }
+    if (!payload) {
+      const response = await fetch('https://pokemon-backend-1080761631887.us-central1.run.app/api/locations?format=columnar');
+      payload = await response.json();
+    }
+    // Older backends ignore ?format= and send the plain array
+    allLocations = Array.isArray(payload) ? payload : decodeColumnar(payload);
 
     // Update location count
     document.getElementById('locationCount').textContent =
@@ -41,6 +83,7 @@ async function loadLocations() {
     addMarkersToMap(allLocations);
 
     // Populate state filter
+    await statsLoaded;
     populateStateFilter();
 
   } catch (error) {
@@ -50,6 +93,41 @@ async function loadLocations() {
   }
 }
 
+// Rebuild location objects from the column-wise payload
+function decodeColumnar(payload) {
+  const columns = payload.columns;
+  const decodeCoords = (column) => {
+    const values = new Array(payload.count);
+    let fixed = 0;
+    for (let i = 0; i < payload.count; i++) {
+      fixed += column.deltas[i];
+      values[i] = fixed / column.scale;
+    }
+    (column.nulls || []).forEach(i => { values[i] = null; });
+    return values;
+  };
+  const latitudes = decodeCoords(columns.latitude);
+  const longitudes = decodeCoords(columns.longitude);
+  const dictionaryColumns = ['retailer', 'name', 'city', 'state', 'zip_code', 'type', 'last_verified'];
+
+  const locations = new Array(payload.count);
+  for (let i = 0; i < payload.count; i++) {
+    const location = {
+      id: columns.id[i],
+      machine_id: columns.machine_id[i],
+      address: columns.address[i],
+      latitude: latitudes[i],
+      longitude: longitudes[i],
+      is_active: columns.is_active[i] === null ? null : columns.is_active[i] === 1
+    };
+    dictionaryColumns.forEach(name => {
+      location[name] = columns[name].dict[columns[name].codes[i]];
+    });
+    locations[i] = location;
+  }
+  return locations;
+}
+
 // Add markers to the map (via cluster group)
 function addMarkersToMap(locations) {
   // Clear existing clustered markers
@@ -88,15 +166,29 @@ function addMarkersToMap(locations) {
   markerCluster.addLayers(toAdd);
 }
 
+// Per-state counts and bounding boxes from /api/stats (null until loaded)
+let locationStats = null;
+
+async function loadStats() {
+  try {
+    const response = await fetch('https://pokemon-backend-1080761631887.us-central1.run.app/api/stats');
+    if (response.ok) locationStats = await response.json();
+  } catch (error) {
+    console.error('Error loading stats:', error);
+  }
+}
+
 // Populate state dropdown filter
 function populateStateFilter() {
   const stateFilter = document.getElementById('stateFilter');
-  const states = [...new Set(allLocations.map(loc => loc.state))].sort();
+  const states = locationStats
+    ? Object.keys(locationStats.states).filter(state => state)
+    : [...new Set(allLocations.map(loc => loc.state))].sort();
 
   states.forEach(state => {
     const option = document.createElement('option');
     option.value = state;
-    option.textContent = state;
+    option.textContent = locationStats ? `${state} (${locationStats.states[state].count})` : state;
     stateFilter.appendChild(option);
   });
 }
@@ -116,6 +208,12 @@ function filterByState() {
   addMarkersToMap(filtered);
   document.getElementById('locationCount').textContent =
     `📍 ${filtered.length} machines found in ${state}`;
+
+  const bbox = locationStats && locationStats.states[state] && locationStats.states[state].bbox;
+  if (bbox) {
+    const [west, south, east, north] = bbox;
+    map.fitBounds([[south, west], [north, east]], { padding: [20, 20] });
+  }
 }
 
 // Find nearby locations using geolocation
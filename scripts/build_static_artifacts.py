@@ -0,0 +1,229 @@
+# scripts/build_static_artifacts.py
+"""Pre-render the read-only API payloads as static files for Firebase Hosting.
+
+The data changes monthly and nearly every read is identical, so this writes
+what the backend would serve straight into frontend/data/, where the CDN
+serves it and page loads never reach Cloud Run:
+
+  data/manifest.json                          short-lived, points at everything else
+  data/artifacts/locations.<hash>.json[.gz|.br]  full dataset (columnar, like ?format=columnar)
+  data/artifacts/stats.<hash>.json            same payload as /api/stats
+  data/artifacts/states/<ST>.<hash>.json      one shard per state
+  data/artifacts/clusters/<hash>/<z>/<x>/<y>.json  clusters in each occupied tile
+  data/artifacts/tiles/<hash>/<z>/<x>/<y>.json     occupied tiles, same body as /tiles/z/x/y
+
+Every name carries a content hash (pyramids hash their whole directory), so
+the artifacts can be cached forever and only the manifest has to expire.
+The backend modules are reused, so the files match the API byte for byte.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.app.cache import store_query
+from backend.app.clustering import ClusterIndex, DEFAULT_MAX_ZOOM
+from backend.app.columnar import encode_columns
+from backend.app.models import LOCATION_FIELDS
+from backend.app.projection import tile_index
+from backend.app.stats import build_stats
+from backend.app.store import LocationStore
+from backend.app.tiles import TileIndex
+from convert_data_to_jsonformat import read_locations
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always written
+    brotli = None
+
+MANIFEST_VERSION = 1
+HASH_LENGTH = 12
+# Tiles deeper than this are few points each; clients overzoom the last level
+PYRAMID_MAX_ZOOM = 12
+
+
+def encode_json(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(*bodies):
+    digest = hashlib.sha256()
+    for body in bodies:
+        digest.update(body)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def normalize_location(location):
+    """A pipeline record in the shape the API returns it"""
+    row = {name: location.get(name) for name in LOCATION_FIELDS}
+    for name in ("latitude", "longitude"):
+        if row[name] is not None:
+            row[name] = round(float(row[name]), 8)  # Numeric(.., 8) in the table
+    if location.get("is_active", True) is not None:
+        row["is_active"] = bool(location.get("is_active", True))
+    return row
+
+
+def load_from_file(path):
+    """Active locations from the pipeline output; a repeated id keeps its last record like the DB upsert"""
+    rows = {location["id"]: normalize_location(location) for location in read_locations(path)}
+    return sorted((row for row in rows.values() if row["is_active"] is not False), key=lambda row: row["id"])
+
+
+def load_from_db(url):
+    """Locations as the API serves them, read with the backend's own query"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(url)
+    try:
+        with Session(engine) as db:
+            return LocationStore(db.execute(store_query()).mappings()).to_dicts()
+    finally:
+        engine.dispose()
+
+
+class ArtifactWriter:
+    """Writes files under the output directory and records them for the manifest"""
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        self.total_bytes = 0
+        self.file_count = 0
+
+    def write(self, relative, body):
+        path = self.out_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        self.total_bytes += len(body)
+        self.file_count += 1
+        return relative
+
+    def write_hashed(self, stem, body, compress=False):
+        """Write <stem>.<hash>.json (plus .gz/.br variants) and describe it"""
+        relative = f"artifacts/{stem}.{content_hash(body)}.json"
+        entry = {"path": self.write(relative, body), "bytes": len(body)}
+        if compress:
+            gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+            entry["gzip"] = {"path": self.write(relative + ".gz", gzip_body), "bytes": len(gzip_body)}
+            if brotli is not None:
+                brotli_body = brotli.compress(body, quality=11)
+                entry["brotli"] = {"path": self.write(relative + ".br", brotli_body), "bytes": len(brotli_body)}
+        return entry
+
+    def write_pyramid(self, name, files):
+        """Write {relative name: body} under artifacts/<name>/<hash of all of them>/"""
+        names = sorted(files)
+        directory = f"artifacts/{name}/{content_hash(*(n.encode() + files[n] for n in names))}"
+        for relative in names:
+            self.write(f"{directory}/{relative}", files[relative])
+        return directory
+
+
+def cluster_pyramid(locations, max_zoom=PYRAMID_MAX_ZOOM):
+    """{"<z>/<x>/<y>.json": clusters in that tile} for every occupied tile up to max_zoom.
+
+    Clusters have the /api/clusters shape; single points carry only their id
+    and position, the rest of the record is in the dataset or state shard.
+    """
+    index = ClusterIndex(locations, max_zoom=max(max_zoom, DEFAULT_MAX_ZOOM))
+    files = {}
+    for zoom in range(max_zoom + 1):
+        for (tile_x, tile_y), clusters in sorted(index.levels[zoom].items()):
+            files[f"{zoom}/{tile_x}/{tile_y}.json"] = encode_json([
+                {"cluster": False, "count": 1, "id": cluster.location["id"],
+                 "latitude": cluster.latitude, "longitude": cluster.longitude}
+                if cluster.location is not None else cluster.to_dict()
+                for cluster in clusters
+            ])
+    return files
+
+
+def tile_pyramid(locations, max_zoom=PYRAMID_MAX_ZOOM):
+    """{"<z>/<x>/<y>.json": tile body} for every occupied tile up to max_zoom"""
+    index = TileIndex(locations, cache_size=0)
+    files = {}
+    for zoom in range(max_zoom + 1):
+        occupied = {tile_index(x, y, zoom) for _, x, y, _ in index.points}
+        for tile_x, tile_y in sorted(occupied):
+            files[f"{zoom}/{tile_x}/{tile_y}.json"] = index.get_tile(zoom, tile_x, tile_y).body
+    return files
+
+
+def build_artifacts(locations, out_dir, max_zoom=PYRAMID_MAX_ZOOM, source=None):
+    """Write every artifact plus manifest.json into out_dir (replacing older builds); returns the manifest"""
+    out_dir = Path(out_dir)
+    shutil.rmtree(out_dir / "artifacts", ignore_errors=True)
+    writer = ArtifactWriter(out_dir)
+
+    dataset = writer.write_hashed("locations", encode_json(encode_columns(locations)), compress=True)
+    stats = build_stats(locations)
+
+    by_state = {}
+    for location in locations:
+        by_state.setdefault(location.get("state") or "", []).append(location)
+    states = {
+        state: writer.write_hashed(f"states/{state}", encode_json(members))
+        for state, members in sorted(by_state.items()) if state
+    }
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "data_version": content_hash(encode_json(locations)),
+        "source": source,
+        "count": len(locations),
+        "locations": dataset,
+        "stats": writer.write_hashed("stats", encode_json(stats)),
+        "states": states,
+        "clusters": {
+            "path": writer.write_pyramid("clusters", cluster_pyramid(locations, max_zoom)) + "/{z}/{x}/{y}.json",
+            "max_zoom": max_zoom,
+        },
+        "tiles": {
+            "path": writer.write_pyramid("tiles", tile_pyramid(locations, max_zoom)) + "/{z}/{x}/{y}.json",
+            "max_zoom": max_zoom,
+        },
+    }
+    writer.write("manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+    manifest["file_count"] = writer.file_count
+    manifest["total_bytes"] = writer.total_bytes
+    return manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build static data artifacts for Firebase Hosting")
+    parser.add_argument('input', nargs='?', default=str(ROOT / 'data' / 'complete_locations.json'),
+                        help="pipeline output (JSON or NDJSON)")
+    parser.add_argument('--database-url', help="read vending_locations from this database instead")
+    parser.add_argument('--output', default=str(ROOT / 'frontend' / 'data'),
+                        help="output directory (default: frontend/data)")
+    parser.add_argument('--max-zoom', type=int, default=PYRAMID_MAX_ZOOM,
+                        help=f"deepest cluster/tile zoom to pre-render (default {PYRAMID_MAX_ZOOM})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.database_url:
+        locations = load_from_db(args.database_url)
+        source = "database"
+    else:
+        locations = load_from_file(args.input)
+        source = Path(args.input).name
+
+    manifest = build_artifacts(locations, args.output, args.max_zoom, source)
+    dataset = manifest["locations"]
+    print(f"Wrote {manifest['file_count']} files ({manifest['total_bytes'] / 1024:.0f} KiB) to {args.output}")
+    print(f"  {manifest['count']} locations, {len(manifest['states'])} state shards, data version {manifest['data_version']}")
+    print(f"  full dataset {dataset['bytes']} bytes, gzip {dataset['gzip']['bytes']}"
+          + (f", brotli {dataset['brotli']['bytes']}" if "brotli" in dataset else " (install brotli for .br)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,133 @@
+import argparse
 import json
 import re
+import sys
 from pathlib import Path
 
+# Columns are separated by a tab or a run of 2+ spaces
+COLUMN_SPLIT = re.compile(r'\t|\s{2,}')
+
+GROCERY_RETAILERS = {"Frys", "Safeway", "Albertsons", "WinCo Foods"}
+
+def parse_line(line):
+    """Parse one 'retailer  machine_id  address  City, State' line, or None if it isn't one"""
+    line = line.strip()
+    if not line:  # Skip empty lines
+        return None
+
+    parts = [p.strip() for p in COLUMN_SPLIT.split(line) if p.strip()]
+    if len(parts) < 4:
+        return None
+
+    retailer = parts[0]
+    machine_id = parts[1]
+    address = parts[2]
+    city_state = parts[3]
+
+    # Extract city and state from "City, State" format
+    if ', ' in city_state:
+        city, state = city_state.split(', ', 1)
+    else:
+        city, state = city_state, "Arizona"  # Default to AZ
+
+    return {
+        "id": f"{retailer.lower()}_{machine_id}",  # Create unique ID
+        "retailer": retailer,
+        "machine_id": machine_id,
+        "name": retailer,
+        "address": address,
+        "city": city,
+        "state": state,
+        "zip_code": "",
+        "latitude": 0.0,  # We'll geocode these later
+        "longitude": 0.0,
+        "type": "grocery" if retailer in GROCERY_RETAILERS else "retail",
+        "last_verified": "2024-01-15",
+        "is_active": True
+    }
+
+def iter_locations(lines):
+    """Yield a location dict for every parseable line of an iterable of lines"""
+    for line in lines:
+        location = parse_line(line)
+        if location is not None:
+            yield location
+
 def convert_text_to_json(text_data):
     """Convert your text data to JSON format automatically"""
-    
-    lines = text_data.strip().split('\n')
-    locations = []
-    
-    for line in lines:
-        if line.strip():  # Skip empty lines
-            # Split the line by tabs or multiple spaces
-            parts = re.split(r'\t|\s{2,}', line.strip())
-            parts = [p.strip() for p in parts if p.strip()]
-            
-            if len(parts) >= 4:
-                retailer = parts[0]
-                machine_id = parts[1]
-                address = parts[2]
-                city_state = parts[3]
-                
-                # Extract city and state from "City, State" format
-                if ', ' in city_state:
-                    city, state = city_state.split(', ', 1)
-                else:
-                    city, state = city_state, "Arizona"  # Default to AZ
-                
-                # Create unique ID
-                location_id = f"{retailer.lower()}_{machine_id}"
-                
-                location = {
-                    "id": location_id,
-                    "retailer": retailer,
-                    "machine_id": machine_id,
-                    "name": retailer,
-                    "address": address,
-                    "city": city,
-                    "state": state,
-                    "zip_code": "",
-                    "latitude": 0.0,  # We'll geocode these later
-                    "longitude": 0.0,
-                    "type": "grocery" if retailer in ["Frys", "Safeway", "Albertsons", "WinCo Foods"] else "retail",
-                    "last_verified": "2024-01-15",
-                    "is_active": True
-                }
-                
-                locations.append(location)
-    
-    return locations
-
-def main():
-    # Load text from file instead of hardcoding
-    input_path = Path(__file__).parent.parent / 'raw_text' / 'locations.txt'
-    text_data = input_path.read_text(encoding='utf-8')
-    
-    locations = convert_text_to_json(text_data)
-
-    # Save to JSON file
-    output_path = Path(__file__).parent.parent / 'data' / 'locations.json'
-    output_path.parent.mkdir(exist_ok=True)
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(locations, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Successfully converted {len(locations)} locations!")
-    print(f"💾 Saved to: {output_path}")
+    return list(iter_locations(text_data.splitlines()))
+
+def write_ndjson(locations, out):
+    """Write one compact JSON object per line; returns the count written"""
+    count = 0
+    for location in locations:
+        out.write(json.dumps(location, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+def write_json_array(locations, out):
+    """Write a compact JSON array one element at a time; returns the count written"""
+    count = 0
+    out.write("[")
+    for location in locations:
+        out.write(("," if count else "") + json.dumps(location, ensure_ascii=False, separators=(",", ":")))
+        count += 1
+    out.write("]\n")
+    return count
+
+def read_locations(path):
+    """Load locations from a JSON array or NDJSON file; '-' reads NDJSON or JSON from stdin"""
+    if str(path) == "-":
+        text = sys.stdin.read()
+    else:
+        text = Path(path).read_text(encoding="utf-8")
+
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def parse_args(argv=None):
+    root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description="Convert raw location text to JSON")
+    parser.add_argument("--input", default=str(root / 'raw_text' / 'locations.txt'),
+                        help="raw text file, or '-' for stdin")
+    parser.add_argument("--output", default=str(root / 'data' / 'locations.json'),
+                        help="output file, or '-' for stdout")
+    parser.add_argument("--format", choices=["json", "ndjson", "array"], default="json",
+                        help="json: indented list (default); ndjson / array: streamed, constant memory")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Stream the input line by line instead of reading it whole
+    source = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    if args.output == "-":
+        out = sys.stdout
+    else:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(exist_ok=True)
+        out = open(output_path, 'w', encoding='utf-8')
+
+    try:
+        locations = iter_locations(source)
+        if args.format == "ndjson":
+            count = write_ndjson(locations, out)
+        elif args.format == "array":
+            count = write_json_array(locations, out)
+        else:
+            locations = list(locations)
+            json.dump(locations, out, indent=2, ensure_ascii=False)
+            count = len(locations)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    # Keep stdout clean for piping; report on stderr
+    print(f"✅ Successfully converted {count} locations!", file=sys.stderr)
+    print(f"💾 Saved to: {args.output}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,232 @@
+# scripts/data_quality.py
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+import numpy as np
+from convert_data_to_jsonformat import read_locations
+
+# Required fields (no zip_code here since it's not always present)
+REQUIRED_FIELDS = [
+    "id", "retailer", "machine_id", "name",
+    "address", "city", "state",
+    "latitude", "longitude",
+    "type", "last_verified", "is_active"
+]
+
+# (west, south, east, north) per state; approximate, padded by STATE_MARGIN_DEG
+STATE_BOUNDS = {
+    "AL": (-88.47, 30.22, -84.89, 35.01), "AK": (-179.15, 51.21, -129.98, 71.37),
+    "AZ": (-114.82, 31.33, -109.05, 37.00), "AR": (-94.62, 33.00, -89.64, 36.50),
+    "CA": (-124.41, 32.53, -114.13, 42.01), "CO": (-109.06, 36.99, -102.04, 41.00),
+    "CT": (-73.73, 40.98, -71.79, 42.05), "DE": (-75.79, 38.45, -75.05, 39.84),
+    "DC": (-77.12, 38.79, -76.91, 39.00), "FL": (-87.63, 24.52, -80.03, 31.00),
+    "GA": (-85.61, 30.36, -80.84, 35.00), "HI": (-178.33, 18.91, -154.81, 28.40),
+    "ID": (-117.24, 41.99, -111.04, 49.00), "IL": (-91.51, 36.97, -87.49, 42.51),
+    "IN": (-88.10, 37.77, -84.78, 41.76), "IA": (-96.64, 40.38, -90.14, 43.50),
+    "KS": (-102.05, 36.99, -94.59, 40.00), "KY": (-89.57, 36.50, -81.96, 39.15),
+    "LA": (-94.04, 28.93, -88.82, 33.02), "ME": (-71.08, 42.98, -66.95, 47.46),
+    "MD": (-79.49, 37.91, -75.05, 39.72), "MA": (-73.51, 41.24, -69.93, 42.89),
+    "MI": (-90.42, 41.70, -82.41, 48.24), "MN": (-97.24, 43.50, -89.49, 49.38),
+    "MS": (-91.66, 30.17, -88.10, 35.00), "MO": (-95.77, 36.00, -89.10, 40.61),
+    "MT": (-116.05, 44.36, -104.04, 49.00), "NE": (-104.05, 40.00, -95.31, 43.00),
+    "NV": (-120.01, 35.00, -114.04, 42.00), "NH": (-72.56, 42.70, -70.61, 45.31),
+    "NJ": (-75.56, 38.93, -73.89, 41.36), "NM": (-109.05, 31.33, -103.00, 37.00),
+    "NY": (-79.76, 40.50, -71.86, 45.02), "NC": (-84.32, 33.84, -75.46, 36.59),
+    "ND": (-104.05, 45.94, -96.55, 49.00), "OH": (-84.82, 38.40, -80.52, 41.98),
+    "OK": (-103.00, 33.62, -94.43, 37.00), "OR": (-124.57, 41.99, -116.46, 46.29),
+    "PA": (-80.52, 39.72, -74.69, 42.27), "RI": (-71.86, 41.15, -71.12, 42.02),
+    "SC": (-83.35, 32.03, -78.54, 35.22), "SD": (-104.06, 42.48, -96.44, 45.95),
+    "TN": (-90.31, 34.98, -81.65, 36.68), "TX": (-106.65, 25.84, -93.51, 36.50),
+    "UT": (-114.05, 37.00, -109.04, 42.00), "VT": (-73.44, 42.73, -71.46, 45.02),
+    "VA": (-83.68, 36.54, -75.24, 39.47), "WA": (-124.76, 45.54, -116.92, 49.00),
+    "WV": (-82.64, 37.20, -77.72, 40.64), "WI": (-92.89, 42.49, -86.81, 47.08),
+    "WY": (-111.06, 40.99, -104.05, 45.01),
+}
+STATE_MARGIN_DEG = 0.05
+
+# Contiguous US, Alaska and Hawaii
+US_BOUNDS = [
+    (-124.8, 24.4, -66.9, 49.4),
+    (-179.2, 51.2, -129.9, 71.4),
+    (-178.4, 18.9, -154.8, 28.5),
+]
+
+CHECKS = [
+    "missing_field", "empty_field", "bad_type", "zero_coordinates",
+    "outside_us", "outside_state", "unknown_state", "duplicate_id", "duplicate_machine_id",
+]
+
+def scan_locations(locations):
+    """Run every data-quality check over the locations in a single pass.
+
+    Per-record field checks run while walking the records; coordinate
+    checks then run vectorized over NumPy arrays of lat/lng. Returns a
+    list of issues, each {"index", "id", "check", "detail"}.
+    """
+    issues = []
+    ids = []
+    lats = []
+    lngs = []
+    states = []
+    first_index_by_id = {}
+    first_index_by_machine = {}
+
+    def issue(index, location_id, check, detail):
+        issues.append({"index": index, "id": location_id, "check": check, "detail": detail})
+
+    for index, entry in enumerate(locations):
+        location_id = entry.get("id")
+        ids.append(location_id)
+
+        for field in REQUIRED_FIELDS:
+            if field not in entry:
+                issue(index, location_id, "missing_field", field)
+            elif entry[field] in ("", None):  # catches empty strings and nulls
+                issue(index, location_id, "empty_field", field)
+
+        lat, lng = entry.get("latitude"), entry.get("longitude")
+        for field, value in (("latitude", lat), ("longitude", lng)):
+            if field in entry and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+                issue(index, location_id, "bad_type", f"{field} must be a number")
+        if "is_active" in entry and not isinstance(entry["is_active"], bool):
+            issue(index, location_id, "bad_type", "is_active must be true/false")
+
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (lat, lng))
+        lats.append(lat if numeric else np.nan)
+        lngs.append(lng if numeric else np.nan)
+        states.append(entry.get("state") or "")
+
+        if location_id not in (None, ""):
+            if location_id in first_index_by_id:
+                issue(index, location_id, "duplicate_id", f"same id as entry {first_index_by_id[location_id]}")
+            else:
+                first_index_by_id[location_id] = index
+        machine_id = entry.get("machine_id")
+        if machine_id not in (None, ""):
+            if machine_id in first_index_by_machine:
+                issue(index, location_id, "duplicate_machine_id",
+                      f"machine_id {machine_id} also on entry {first_index_by_machine[machine_id]}")
+            else:
+                first_index_by_machine[machine_id] = index
+
+    issues.extend(scan_coordinates(np.array(lats, dtype=float), np.array(lngs, dtype=float),
+                                   np.array(states, dtype=object), ids))
+    issues.sort(key=lambda item: (item["index"], CHECKS.index(item["check"])))
+    return issues
+
+def scan_coordinates(lats, lngs, states, ids):
+    """Vectorized coordinate checks over parallel arrays"""
+    issues = []
+    valid = ~(np.isnan(lats) | np.isnan(lngs))
+
+    zero = valid & (lats == 0.0) & (lngs == 0.0)
+    located = valid & ~zero
+
+    in_us = np.zeros(len(lats), dtype=bool)
+    for west, south, east, north in US_BOUNDS:
+        in_us |= (lngs >= west) & (lngs <= east) & (lats >= south) & (lats <= north)
+    outside_us = located & ~in_us
+
+    known_state = np.isin(states, list(STATE_BOUNDS))
+    outside_state = np.zeros(len(lats), dtype=bool)
+    for state, (west, south, east, north) in STATE_BOUNDS.items():
+        rows = located & (states == state)
+        if rows.any():
+            outside_state |= rows & ~(
+                (lngs >= west - STATE_MARGIN_DEG) & (lngs <= east + STATE_MARGIN_DEG)
+                & (lats >= south - STATE_MARGIN_DEG) & (lats <= north + STATE_MARGIN_DEG)
+            )
+    # A point outside the US is already reported; don't pile on
+    outside_state &= ~outside_us
+
+    for index in np.flatnonzero(zero):
+        issues.append({"index": int(index), "id": ids[index], "check": "zero_coordinates",
+                       "detail": "latitude and longitude are 0.0 (geocoding failed)"})
+    for index in np.flatnonzero(outside_us):
+        issues.append({"index": int(index), "id": ids[index], "check": "outside_us",
+                       "detail": f"({lats[index]}, {lngs[index]}) is outside the US"})
+    for index in np.flatnonzero(outside_state):
+        issues.append({"index": int(index), "id": ids[index], "check": "outside_state",
+                       "detail": f"({lats[index]}, {lngs[index]}) is outside {states[index]}"})
+    # A blank state is already reported as a missing/empty field
+    for index in np.flatnonzero(~known_state & (states != "")):
+        issues.append({"index": int(index), "id": ids[index], "check": "unknown_state",
+                       "detail": f"state {states[index]!r} is not a US state code"})
+    return issues
+
+def build_report(path, locations, issues):
+    """Machine-readable summary of a scan"""
+    counts = Counter(item["check"] for item in issues)
+    return {
+        "file": str(path),
+        "records": len(locations),
+        "counts": {check: counts.get(check, 0) for check in CHECKS},
+        "issues": issues,
+    }
+
+def find_failed_geocodes(input_path, json_output_path, text_output_path):
+    """Write the locations still at (0, 0) as JSON plus a text list for manual lookup"""
+    locations = read_locations(input_path)
+    failed_indexes = {item["index"] for item in scan_locations(locations) if item["check"] == "zero_coordinates"}
+    failed_locations = [loc for index, loc in enumerate(locations) if index in failed_indexes]
+
+    # Save failed locations to a separate file
+    with open(json_output_path, 'w', encoding='utf-8') as f:
+        json.dump(failed_locations, f, indent=2, ensure_ascii=False)
+
+    # Also create a text file for easy manual lookup
+    with open(text_output_path, 'w', encoding='utf-8') as f:
+        f.write("FAILED GEOCODING - NEED MANUAL COORDINATES\n")
+        f.write("=" * 50 + "\n\n")
+
+        for i, loc in enumerate(failed_locations, 1):
+            f.write(f"{i}. {loc['name']}\n")
+            f.write(f"   Address: {loc['address']}, {loc['city']}, {loc['state']}\n")
+            f.write(f"   ID: {loc['id']}\n")
+            f.write(f"   Machine ID: {loc['machine_id']}\n")
+            f.write("-" * 40 + "\n")
+
+    print(f"✅ Found {len(failed_locations)} failed geocodes")
+    print(f"💾 Saved to: {json_output_path}")
+    print(f"📝 Text list: {text_output_path}")
+
+    # Print summary
+    if failed_locations:
+        print("\n🔍 Sample of failed locations:")
+        for i, loc in enumerate(failed_locations[:5], 1):  # Show first 5
+            print(f"   {i}. {loc['name']} - {loc['address']}, {loc['city']}")
+    else:
+        print("🎉 All locations were successfully geocoded!")
+    return failed_locations
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scan a location file for data-quality issues")
+    parser.add_argument("input", nargs="?", default="data/complete_locations.json",
+                        help="JSON or NDJSON location file, '-' for stdin")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--fail-on", default="",
+                        help="comma-separated checks that make the exit status 1, or 'any'")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    locations = read_locations(args.input)
+    report = build_report(args.input, locations, scan_locations(locations))
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    else:
+        print(payload)
+
+    summary = ", ".join(f"{check}={n}" for check, n in report["counts"].items() if n) or "no issues"
+    print(f"🔎 {report['records']} records: {summary}", file=sys.stderr)
+
+    fail_on = {check.strip() for check in args.fail_on.split(",") if check.strip()}
+    failing = report["counts"] if "any" in fail_on else {c: report["counts"].get(c, 0) for c in fail_on}
+    return 1 if any(failing.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,20 @@
 import json
 import os
-
-# Required fields (no zip_code here since it's not always present)
-REQUIRED_FIELDS = [
-    "id", "retailer", "machine_id", "name", 
-    "address", "city", "state", 
-    "latitude", "longitude", 
-    "type", "last_verified", "is_active"
-]
+from convert_data_to_jsonformat import read_locations
+from data_quality import scan_locations
+
+def format_issue(item) -> str:
+    """Render a scanner issue in the validator's message style."""
+    index, check, detail = item["index"], item["check"], item["detail"]
+    if check == "missing_field":
+        return f"Entry {index} missing field: {detail}"
+    if check == "empty_field":
+        return f"Entry {index} field '{detail}' is empty"
+    return f"Entry {index} {detail}"
 
 def validate_entry(entry: dict, index: int) -> list:
     """Check if a single vending machine entry has all required fields and valid values."""
-    errors = []
-    
-    for field in REQUIRED_FIELDS:
-        if field not in entry:
-            errors.append(f"Entry {index} missing field: {field}")
-        else:
-            value = entry[field]
-            if value in ("", None):  # catches empty strings and nulls
-                errors.append(f"Entry {index} field '{field}' is empty")
-
-    # Type checks
-    if "latitude" in entry and not isinstance(entry["latitude"], (int, float)):
-        errors.append(f"Entry {index} latitude must be a number")
-    if "longitude" in entry and not isinstance(entry["longitude"], (int, float)):
-        errors.append(f"Entry {index} longitude must be a number")
-    if "is_active" in entry and not isinstance(entry["is_active"], bool):
-        errors.append(f"Entry {index} is_active must be true/false")
-    
-    return errors
+    return [format_issue(dict(item, index=index)) for item in scan_locations([entry])]
 
 
 def validate_file(filepath: str):
@@ -38,18 +23,14 @@ def validate_file(filepath: str):
         print(f"Error: File '{filepath}' not found.")
         return
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"Error: Invalid JSON format in {filepath} — {e}")
-            return
-    
-    all_errors = []
-    for idx, entry in enumerate(data):
-        entry_errors = validate_entry(entry, idx)
-        all_errors.extend(entry_errors)
-    
+    try:
+        data = read_locations(filepath)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON format in {filepath} — {e}")
+        return
+
+    all_errors = [format_issue(item) for item in scan_locations(data)]
+
     if all_errors:
         print("Validation completed with errors:")
         for err in all_errors:
@@ -0,0 +1,224 @@
+# scripts/dedup_locations.py
+import argparse
+import json
+import math
+import re
+from difflib import SequenceMatcher
+from pathlib import Path
+from convert_data_to_jsonformat import read_locations
+from geocode_cache import normalize_address
+
+DEFAULT_RADIUS_M = 30.0
+METERS_PER_DEGREE = 111_320.0
+
+# Addresses this similar (after normalization) with the same house number
+# count as the same store, e.g. "1234 W Main St" vs "1234 Main St."
+ADDRESS_SIMILARITY = 0.85
+
+def has_coords(loc):
+    return bool(loc.get('latitude')) and bool(loc.get('longitude'))
+
+def distance_m(a, b):
+    """Equirectangular distance in meters; exact enough at a few hundred meters"""
+    mean_lat = math.radians((a['latitude'] + b['latitude']) / 2)
+    dx = (b['longitude'] - a['longitude']) * math.cos(mean_lat) * METERS_PER_DEGREE
+    dy = (b['latitude'] - a['latitude']) * METERS_PER_DEGREE
+    return math.hypot(dx, dy)
+
+def grid_row(loc, radius_m):
+    return int(loc['latitude'] * METERS_PER_DEGREE // radius_m)
+
+def row_scale(row, radius_m):
+    """Meters per degree of longitude along the middle of a grid row.
+
+    Using one factor per row (not each point's own latitude) keeps a row's
+    columns aligned, so points a few meters apart never skip a column.
+    """
+    return math.cos(math.radians((row + 0.5) * radius_m / METERS_PER_DEGREE)) * METERS_PER_DEGREE
+
+def grid_cell(loc, radius_m):
+    """Hash-grid cell with sides of radius_m (columns scaled per row)"""
+    row = grid_row(loc, radius_m)
+    return int(loc['longitude'] * row_scale(row, radius_m) // radius_m), row
+
+def address_key(loc):
+    return normalize_address(loc.get('address'), loc.get('city'), loc.get('state'))
+
+def house_number(key):
+    match = re.match(r"\d+", key)
+    return match.group() if match else None
+
+def same_address(key_a, key_b):
+    """Normalized-address comparison used to confirm a nearby pair"""
+    if key_a == key_b:
+        return True
+    street_a, city_a, state_a = key_a.split("|")
+    street_b, city_b, state_b = key_b.split("|")
+    if (city_a, state_a) != (city_b, state_b) or house_number(street_a) != house_number(street_b):
+        return False
+    shorter, longer = sorted((street_a, street_b), key=len)
+    if longer.startswith(shorter + " "):  # same street plus a suite/unit
+        return True
+    return SequenceMatcher(None, street_a, street_b).ratio() >= ADDRESS_SIMILARITY
+
+def candidate_pairs(locations, radius_m=DEFAULT_RADIUS_M):
+    """Index pairs closer than radius_m, found through a spatial hash grid.
+
+    Every located point goes in one cell; each point is compared only with
+    the cells within radius_m of it in its own and the two neighbouring
+    rows (measured with each row's own scale), so the cost grows with n
+    instead of n².
+    """
+    grid = {}
+    for i, loc in enumerate(locations):
+        if has_coords(loc):
+            grid.setdefault(grid_cell(loc, radius_m), []).append(i)
+
+    for i, loc in enumerate(locations):
+        if not has_coords(loc):
+            continue
+        row = grid_row(loc, radius_m)
+        for other_row in (row - 1, row, row + 1):
+            x = loc['longitude'] * row_scale(other_row, radius_m)
+            for column in range(int((x - radius_m) // radius_m), int((x + radius_m) // radius_m) + 1):
+                for j in grid.get((column, other_row), ()):
+                    if i < j:
+                        d = distance_m(loc, locations[j])
+                        if d <= radius_m:
+                            yield i, j, d
+
+def pick_survivor(group):
+    """The record to keep: active first, then most recently verified, then most complete"""
+    def rank(loc):
+        filled = sum(1 for value in loc.values() if value not in ("", None, 0.0))
+        return (bool(loc.get('is_active')), str(loc.get('last_verified') or ''), filled)
+    return max(group, key=rank)
+
+def find_duplicates(locations, radius_m=DEFAULT_RADIUS_M):
+    """Merge suggestions for records that are the same store.
+
+    Two records match when they share a normalized address, or lie within
+    radius_m of each other and their addresses confirm it. Matches are
+    grouped transitively. Records repeating an id are collapsed first
+    (last one wins, as the import's upsert would do).
+
+    Returns a list of {"keep", "drop", "reason", "max_distance_m"}.
+    """
+    by_id = {}
+    for loc in locations:
+        by_id[loc['id']] = loc
+    unique = list(by_id.values())
+    keys = [address_key(loc) for loc in unique]
+
+    parent = list(range(len(unique)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    matches = []  # (i, j, reason, distance or None)
+
+    first_by_key = {}
+    for i, key in enumerate(keys):
+        if key in first_by_key:
+            j = first_by_key[key]
+            d = distance_m(unique[i], unique[j]) if has_coords(unique[i]) and has_coords(unique[j]) else None
+            matches.append((j, i, "same_address", d))
+            parent[find(i)] = find(j)
+        else:
+            first_by_key[key] = i
+
+    for i, j, d in candidate_pairs(unique, radius_m):
+        if find(i) != find(j) and same_address(keys[i], keys[j]):
+            matches.append((i, j, "nearby_similar_address", d))
+            parent[find(j)] = find(i)
+
+    groups = {}
+    for i, j, reason, d in matches:
+        group = groups.setdefault(find(i), {"members": set(), "reasons": set(), "max_distance_m": 0.0})
+        group["members"].update((i, j))
+        group["reasons"].add(reason)
+        group["max_distance_m"] = max(group["max_distance_m"], d or 0.0)
+
+    suggestions = []
+    for group in groups.values():
+        members = [unique[i] for i in sorted(group["members"])]
+        keep = pick_survivor(members)
+        suggestions.append({
+            "keep": keep['id'],
+            "drop": sorted(loc['id'] for loc in members if loc is not keep),
+            "reason": ",".join(sorted(group["reasons"])),
+            "max_distance_m": round(group["max_distance_m"], 1),
+        })
+    suggestions.sort(key=lambda s: s["keep"])
+    return suggestions
+
+def apply_merge_suggestions(locations, suggestions):
+    """Drop the merged-away records, filling blank fields of the survivor from them.
+
+    Returns (remaining locations, dropped ids).
+    """
+    by_id = {loc['id']: loc for loc in locations}
+    dropped = set()
+    for suggestion in suggestions:
+        keep = by_id.get(suggestion["keep"])
+        if keep is None:
+            continue
+        for drop_id in suggestion["drop"]:
+            other = by_id.get(drop_id)
+            if other is None:
+                continue
+            for field, value in other.items():
+                if keep.get(field) in ("", None) and value not in ("", None):
+                    keep[field] = value
+            dropped.add(drop_id)
+
+    remaining = [loc for loc in locations if loc['id'] not in dropped]
+    return remaining, sorted(dropped)
+
+def combine_suggestions(*suggestion_lists):
+    """Union of several merge decision lists, one entry per survivor"""
+    combined = {}
+    for suggestions in suggestion_lists:
+        for suggestion in suggestions:
+            entry = combined.setdefault(suggestion["keep"], {**suggestion, "drop": []})
+            entry["drop"] = sorted(set(entry["drop"]) | set(suggestion["drop"]))
+    return sorted(combined.values(), key=lambda s: s["keep"])
+
+def load_suggestions(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_suggestions(path, suggestions):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(suggestions, f, indent=2, ensure_ascii=False)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Suggest merges for duplicate locations")
+    parser.add_argument('input', nargs='?', default='data/complete_locations.json',
+                        help="JSON or NDJSON location file, '-' for stdin")
+    parser.add_argument('--output', default='data/merge_suggestions.json',
+                        help="where to write the merge suggestions")
+    parser.add_argument('--radius-m', type=float, default=DEFAULT_RADIUS_M,
+                        help=f"max distance between duplicates in meters (default {DEFAULT_RADIUS_M:g})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    locations = read_locations(args.input)
+    suggestions = find_duplicates(locations, args.radius_m)
+
+    output_path = Path(args.output)
+    save_suggestions(output_path, suggestions)
+
+    dropped = sum(len(s["drop"]) for s in suggestions)
+    print(f"🔍 {len(locations)} locations, {len(suggestions)} duplicate groups, {dropped} records to merge away")
+    for suggestion in suggestions[:5]:
+        print(f"   keep {suggestion['keep']} ← {', '.join(suggestion['drop'])} ({suggestion['reason']})")
+    print(f"💾 Saved to: {output_path}")
+    print(f"   Apply with: python scripts/import_locations_to_db.py --apply-merges {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# scripts/geocode_cache.py
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / 'data' / 'geocode_cache.sqlite'
+
+# Common USPS street suffix / direction abbreviations
+ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'boulevard': 'blvd', 'drive': 'dr',
+    'lane': 'ln', 'court': 'ct', 'place': 'pl', 'parkway': 'pkwy', 'highway': 'hwy',
+    'circle': 'cir', 'terrace': 'ter', 'trail': 'trl', 'square': 'sq', 'suite': 'ste',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    key TEXT PRIMARY KEY,
+    address TEXT,
+    city TEXT,
+    state TEXT,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    source TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+def normalize_address(address, city, state):
+    """Canonical 'address|city|state' key: lowercase, no punctuation, abbreviated"""
+    parts = []
+    for part in (address, city, state):
+        words = re.sub(r"[^\w\s]", " ", (part or "").lower()).split()
+        parts.append(" ".join(ABBREVIATIONS.get(word, word) for word in words))
+    return "|".join(parts)
+
+class GeocodeCache:
+    """On-disk address -> coordinates cache shared by every geocoding tool.
+
+    Entries record their source ('auto' from a geocoding API, 'manual'
+    from a person). Manual entries are never overwritten by auto results
+    and never expire; auto entries expire after `ttl_days` if set.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.hits = 0
+        self.misses = 0
+        # Geocoder worker threads share one connection behind a lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def get(self, address, city, state):
+        """Cached (lat, lng) for the address, or None on a miss"""
+        key = normalize_address(address, city, state)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT latitude, longitude, source, updated_at FROM geocodes WHERE key = ?", (key,)
+            ).fetchone()
+            expired = (
+                row is not None and row[2] == 'auto' and self.ttl_seconds is not None
+                and time.time() - row[3] > self.ttl_seconds
+            )
+            if row is None or expired:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0], row[1]
+
+    def put(self, address, city, state, lat, lng, source='auto'):
+        """Store coordinates; auto results don't replace manual corrections"""
+        key = normalize_address(address, city, state)
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT INTO geocodes (key, address, city, state, latitude, longitude, source, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    address = excluded.address, city = excluded.city, state = excluded.state,
+                    latitude = excluded.latitude, longitude = excluded.longitude,
+                    source = excluded.source, updated_at = excluded.updated_at
+                WHERE excluded.source = 'manual' OR geocodes.source != 'manual'
+                """,
+                (key, address, city, state, lat, lng, source, time.time())
+            )
+            self.conn.commit()
+
+    def stats(self):
+        """Hit/miss counters for this run plus entry counts by source"""
+        with self.lock:
+            by_source = dict(self.conn.execute("SELECT source, COUNT(*) FROM geocodes GROUP BY source"))
+        return {'hits': self.hits, 'misses': self.misses, 'entries': by_source}
+
+    def close(self):
+        self.conn.close()
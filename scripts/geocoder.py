@@ -1,61 +1,249 @@
 # scripts/geocoder.py
 #94% accuracy rate
+import argparse
 import requests  # ← ADD THIS!
 import json
+import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from convert_data_to_jsonformat import read_locations
+from geocode_cache import DEFAULT_CACHE_PATH, GeocodeCache, normalize_address
+
+USER_AGENT = 'PokemonVendingFinder/1.0 (https://github.com/yourusername/Pokemon-Vending-Machine-Finder)'
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second, bursts up to `capacity`.
+
+    Callers reserve a token even when the bucket is empty and sleep only
+    until their own slot, so N workers together run at exactly `rate`
+    with no idle gaps between requests.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+class NominatimBackend:
+    """Nominatim /search API, public or self-hosted"""
+
+    def __init__(self, base_url="https://nominatim.openstreetmap.org/search", rate=1.0, burst=1):
+        self.base_url = base_url
+        self.rate = rate
+        self.burst = burst
+
+    def request(self, address, city, state):
+        query = f"{address}, {city}, {state}, USA"
+        return query, self.base_url, {'q': query, 'format': 'json', 'limit': 1}
+
+    def parse(self, data):
+        if data:
+            return float(data[0]['lat']), float(data[0]['lon'])
+        return None, None
+
+# Presets for --backend; the public server allows 1 request/second
+BACKENDS = {
+    'nominatim': lambda: NominatimBackend(),
+    'nominatim-local': lambda: NominatimBackend('http://localhost:8080/search', rate=50, burst=10),
+}
+
+class GeocodeJournal:
+    """Append-only NDJSON log of finished lookups, used to resume a run.
+
+    Each line is {"id", "address", "latitude", "longitude"} with the
+    normalized address that was looked up and null coordinates for failed
+    lookups; an entry is only reused while the location's address still
+    matches. Lines are buffered and flushed every `flush_every` records, so
+    a crash loses at most that many requests.
+    """
+
+    def __init__(self, path, flush_every=25):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.pending = 0
+        self.file = None
+
+    def load(self):
+        """Results recorded so far as {id: (address, lat, lng)}; a torn last line is ignored"""
+        done = {}
+        if not self.path.exists():
+            return done
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                done[entry['id']] = (entry.get('address'), entry['latitude'], entry['longitude'])
+        return done
+
+    def reset(self):
+        if self.path.exists():
+            self.path.unlink()
+
+    def record(self, location, lat, lng):
+        if self.file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            torn = self.path.exists() and self.path.stat().st_size and not self.path.read_bytes().endswith(b'\n')
+            self.file = open(self.path, 'a', encoding='utf-8')
+            if torn:
+                # Start on a fresh line after a write cut short by a crash
+                self.file.write('\n')
+        entry = {'id': location['id'], 'address': address_key(location), 'latitude': lat, 'longitude': lng}
+        self.file.write(json.dumps(entry) + '\n')
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def in_shard(location_id, shard):
+    """True if the location belongs to shard (index, count); stable across input order"""
+    if shard is None:
+        return True
+    index, count = shard
+    return zlib.crc32(location_id.encode('utf-8')) % count == index
+
+def parse_shard(value):
+    """Parse 'i/n' (0-based shard i of n)"""
+    index, count = (int(part) for part in value.split('/'))
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError("shard must be i/n with 0 <= i < n")
+    return index, count
+
+def address_key(location):
+    return normalize_address(location.get('address'), location.get('city'), location.get('state'))
+
+def current_results(locations, done):
+    """Journal entries {id: (lat, lng)} whose recorded address still matches the location"""
+    return {
+        location['id']: done[location['id']][1:]
+        for location in locations
+        if location['id'] in done and done[location['id']][0] == address_key(location)
+    }
+
+def apply_journal_results(locations, done):
+    """Copy successful journal results onto the matching locations"""
+    applied = 0
+    for location in locations:
+        lat, lng = done.get(location['id'], (None, None))
+        if lat and lng:
+            location['latitude'] = lat
+            location['longitude'] = lng
+            applied += 1
+    return applied
 
 class NominatimGeocoder:
-    def __init__(self):
-        self.base_url = "https://nominatim.openstreetmap.org/search"
-        self.delay = 1
+    def __init__(self, backend=None, workers=1, cache=None):
+        self.backend = backend or NominatimBackend()
+        self.workers = workers
+        self.cache = cache
         self.headers = {
-            'User-Agent': 'PokemonVendingFinder/1.0 (https://github.com/yourusername/Pokemon-Vending-Machine-Finder)'
+            'User-Agent': USER_AGENT
         }
-    
-    def geocode_address(self, address, city, state):
-        """Geocode a single address using Nominatim"""
-        query = f"{address}, {city}, {state}, USA"
-        params = {
-            'q': query,
-            'format': 'json',
-            'limit': 1
-        }
-        
+        self.limiter = TokenBucket(self.backend.rate, self.backend.burst)
+
+        # One pooled keep-alive session shared by every worker thread
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(self.headers)
+
+    def geocode_address(self, address, city, state, raise_errors=False):
+        """Geocode a single address: cache first, then the rate-limited backend.
+
+        Returns (None, None) when the backend has no match. HTTP errors,
+        timeouts and 429s also return (None, None) unless raise_errors is
+        set, in which case they propagate so the caller can retry later.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(address, city, state)
+            if cached:
+                return cached
+
+        query, url, params = self.backend.request(address, city, state)
+
         try:
-            response = requests.get(self.base_url, params=params, headers=self.headers)
+            self.limiter.acquire()
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            
-            data = response.json()
-            if data:
-                return float(data[0]['lat']), float(data[0]['lon'])
-            
+
+            lat, lng = self.backend.parse(response.json())
+            if lat and lng and self.cache is not None:
+                self.cache.put(address, city, state, lat, lng, source='auto')
+            return lat, lng
+
         except Exception as e:  # ← FIXED TYPO!
+            if raise_errors:
+                raise
             print(f"Error geocoding {query}: {e}")
-            
+
         return None, None
-    
-    def geocode_all_locations(self, input_path, output_path):
-        """Geocode all locations in the JSON file"""
-        with open(input_path, 'r', encoding='utf-8') as f:
-            locations = json.load(f)
-        
+
+    def geocode_locations(self, locations, journal=None, shard=None):
+        """Geocode every location still at (0, 0) in place; returns (successful, failed).
+
+        Locations already in the journal are skipped, and only those in
+        `shard` (index, count) are looked up. Only answers from the backend
+        (a match or a real "no match") are journaled; lookups that hit an
+        HTTP error, timeout or 429 stay pending so a resumed run retries
+        them. Ctrl-C stops cleanly with the journal flushed so the run can
+        be resumed.
+        """
+        done = current_results(locations, journal.load()) if journal else {}
+        if done:
+            print(f"Resuming: {apply_journal_results(locations, done)} results restored from {journal.path}")
+
+        pending = [
+            (i, location) for i, location in enumerate(locations)
+            if location['latitude'] == 0.0 and location['longitude'] == 0.0
+            and location['id'] not in done and in_shard(location['id'], shard)
+        ]
         successful = 0
         failed = 0
-        
-        print(f"Starting geocoding for {len(locations)} locations...")
-        print("This will take about 2-3 minutes due to rate limiting...")
-        
-        for i, location in enumerate(locations):
-            if location['latitude'] == 0.0 and location['longitude'] == 0.0:
-                print(f"Geocoding {i+1}/{len(locations)}: {location['name']} in {location['city']}")
-                
-                lat, lng = self.geocode_address(
-                    location['address'],
-                    location['city'], 
-                    location['state']
-                )
-                
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {
+                pool.submit(
+                    self.geocode_address, location['address'], location['city'], location['state'], True
+                ): (i, location)
+                for i, location in pending
+            }
+            for completed, future in enumerate(as_completed(futures), 1):
+                i, location = futures[future]
+                try:
+                    lat, lng = future.result()
+                except Exception as e:
+                    print(f"  ⚠️ Error geocoding {location['address']}: {e} (left pending for the next run)")
+                    failed += 1
+                    continue
+                print(f"Geocoded {completed}/{len(pending)}: {location['name']} in {location['city']}")
+
                 if lat and lng:
                     location['latitude'] = lat
                     location['longitude'] = lng
@@ -63,20 +251,104 @@ class NominatimGeocoder:
                 else:
                     print(f"  ❌ Failed to geocode: {location['address']}")
                     failed += 1
-                
-                time.sleep(self.delay)
-        
-        output_path = Path(output_path)
-        output_path.parent.mkdir(exist_ok=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(locations, f, indent=2, ensure_ascii=False)
-        
+                if journal:
+                    journal.record(location, lat, lng)
+        except KeyboardInterrupt:
+            print("\n⏸️ Interrupted; progress is saved in the journal, re-run to resume")
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            if journal:
+                journal.flush()
+                journal.close()
+        pool.shutdown()
+
+        return successful, failed
+
+    def geocode_all_locations(self, input_path, output_path, journal_path=None, shard=None):
+        """Geocode all locations in the JSON file.
+
+        The journal only exists to resume an interrupted run: once an
+        unsharded run finishes it is removed, so next month's input starts
+        fresh (shard journals are kept for --apply-journal).
+        """
+        locations = read_locations(input_path)
+
+        print(f"Starting geocoding for {len(locations)} locations...")
+        print(f"Rate limit: {self.backend.rate} requests/second across {self.workers} workers")
+        if shard:
+            print(f"Shard {shard[0]}/{shard[1]}")
+
+        journal = GeocodeJournal(journal_path) if journal_path else None
+        successful, failed = self.geocode_locations(locations, journal, shard)
+
+        write_locations(locations, output_path)
+        if journal and not shard:
+            journal.reset()
+
         print("\n✅ Geocoding complete!")
         print(f"   Successful: {successful}")
         print(f"   Failed: {failed}")
         print(f"   Saved to: {output_path}")
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"   Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+
+def write_locations(locations, output_path):
+    output_path = Path(output_path)
+    output_path.parent.mkdir(exist_ok=True)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(locations, f, indent=2, ensure_ascii=False)
+
+def default_journal_path(output_path, shard):
+    suffix = f".shard-{shard[0]}-of-{shard[1]}" if shard else ""
+    return f"{output_path}{suffix}.journal"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Geocode locations still at (0, 0)")
+    parser.add_argument('input', nargs='?', default='data/locations.json', help="JSON or NDJSON, '-' for stdin")
+    parser.add_argument('output', nargs='?', default='data/locations_geocoded.json')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='nominatim')
+    parser.add_argument('--base-url', help="override the backend's search URL")
+    parser.add_argument('--rate', type=float, help="override requests per second")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent requests (default 4)")
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH), help="geocode cache database")
+    parser.add_argument('--no-cache', action='store_true', help="always query the backend")
+    parser.add_argument('--cache-ttl-days', type=float, help="re-query auto results older than this")
+    parser.add_argument('--shard', type=parse_shard, help="only geocode shard i/n (0-based), e.g. 0/4")
+    parser.add_argument('--journal', help="checkpoint journal (default: <output>[.shard-i-of-n].journal)")
+    parser.add_argument('--fresh', action='store_true', help="discard the journal instead of resuming an interrupted run")
+    parser.add_argument('--apply-journal', nargs='+', metavar='JOURNAL',
+                        help="don't geocode; merge these (shard) journals into the output")
+    return parser.parse_args(argv)
+
+def merge_journals(input_path, output_path, journal_paths):
+    """Combine the journals of several (sharded) runs into one output file"""
+    locations = read_locations(input_path)
+    done = {}
+    for path in journal_paths:
+        done.update(GeocodeJournal(path).load())
+    applied = apply_journal_results(locations, current_results(locations, done))
+    write_locations(locations, output_path)
+    print(f"✅ Applied {applied} results from {len(journal_paths)} journals to {output_path}")
 
 if __name__ == "__main__":
-    geocoder = NominatimGeocoder()
-    geocoder.geocode_all_locations('data/locations.json', 'data/locations_geocoded.json')
\ No newline at end of file
+    args = parse_args()
+    if args.apply_journal:
+        merge_journals(args.input, args.output, args.apply_journal)
+        raise SystemExit
+    backend = BACKENDS[args.backend]()
+    if args.base_url:
+        backend.base_url = args.base_url
+    if args.rate:
+        backend.rate = args.rate
+    cache = None if args.no_cache else GeocodeCache(args.cache, ttl_days=args.cache_ttl_days)
+    geocoder = NominatimGeocoder(backend, workers=args.workers, cache=cache)
+    journal_path = args.journal or default_journal_path(args.output, args.shard)
+    if args.fresh:
+        GeocodeJournal(journal_path).reset()
+    try:
+        geocoder.geocode_all_locations(args.input, args.output, journal_path, args.shard)
+    except KeyboardInterrupt:
+        raise SystemExit(130)
@@ -1,58 +1,145 @@
+import argparse
 import json
 import os
+import sqlite3
+import tempfile
+import time
 import mysql.connector
+import requests
 from dotenv import load_dotenv
+from convert_data_to_jsonformat import read_locations
+from dedup_locations import apply_merge_suggestions, combine_suggestions, load_suggestions, save_suggestions
+from location_diff import diff_locations, fetch_stored_state
 
 # Load environment variables
 load_dotenv()
 
-# Load JSON file
-with open("data/complete_locations.json", "r") as f:
-    locations = json.load(f)
+DEFAULT_INPUT = "data/complete_locations.json"
+# Merge decisions already applied; re-applied on every import so merged-away
+# duplicates that are still in the source file stay inactive
+DEFAULT_MERGES_FILE = "data/applied_merges.json"
+DEFAULT_BATCH_SIZE = 500
 
-# Connect to MySQL
-try:
-    conn = mysql.connector.connect(
+COLUMNS = [
+    "id", "retailer", "machine_id", "name", "address", "city", "state", "zip_code",
+    "latitude", "longitude", "type", "last_verified", "is_active"
+]
+UPDATE_COLUMNS = [col for col in COLUMNS if col != "id"]
+
+# Insert/Update query (one row)
+INSERT_QUERY = """
+INSERT INTO vending_locations (
+    id, retailer, machine_id, name, address, city, state, zip_code,
+    latitude, longitude, type, last_verified, is_active
+) VALUES (
+    %(id)s, %(retailer)s, %(machine_id)s, %(name)s, %(address)s, %(city)s,
+    %(state)s, %(zip_code)s, %(latitude)s, %(longitude)s, %(type)s,
+    %(last_verified)s, %(is_active)s
+) ON DUPLICATE KEY UPDATE
+    retailer = VALUES(retailer),
+    machine_id = VALUES(machine_id),
+    name = VALUES(name),
+    address = VALUES(address),
+    city = VALUES(city),
+    state = VALUES(state),
+    zip_code = VALUES(zip_code),
+    latitude = VALUES(latitude),
+    longitude = VALUES(longitude),
+    type = VALUES(type),
+    last_verified = VALUES(last_verified),
+    is_active = VALUES(is_active);
+"""
+
+MYSQL_ON_DUPLICATE = "ON DUPLICATE KEY UPDATE " + ", ".join(
+    f"{col} = VALUES({col})" for col in UPDATE_COLUMNS
+)
+
+SQLITE_UPSERT_QUERY = (
+    f"INSERT INTO vending_locations ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join(':' + col for col in COLUMNS)}) "
+    "ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col in UPDATE_COLUMNS)
+)
+
+# Mirrors vending_machine_backup.sql so local SQLite runs match production
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vending_locations (
+    id VARCHAR(50) NOT NULL PRIMARY KEY,
+    retailer VARCHAR(100),
+    machine_id VARCHAR(50),
+    name VARCHAR(100),
+    address VARCHAR(200),
+    city VARCHAR(100),
+    state VARCHAR(10),
+    zip_code VARCHAR(20),
+    latitude NUMERIC(10, 8),
+    longitude NUMERIC(11, 8),
+    type VARCHAR(50),
+    last_verified DATE,
+    is_active BOOLEAN
+)
+"""
+
+# Same indexes as backend/migrations (0002)
+SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_vending_locations_state ON vending_locations (state)",
+    "CREATE INDEX IF NOT EXISTS ix_vending_locations_lat_lng ON vending_locations (latitude, longitude)",
+]
+
+def notify_api():
+    """Tell the API to drop its cached snapshot/tiles after rows changed"""
+    url = os.getenv("API_INVALIDATE_URL")  # e.g. https://<backend>/api/admin/invalidate
+    token = os.getenv("ADMIN_TOKEN")
+    if not url or not token:
+        print("ℹ️ API_INVALIDATE_URL/ADMIN_TOKEN not set; API caches refresh on their next version check")
+        return
+    try:
+        response = requests.post(url, headers={"X-Admin-Token": token}, timeout=10)
+        response.raise_for_status()
+        print("🧹 API caches invalidated")
+    except requests.RequestException as e:
+        print(f"⚠️ Could not invalidate API caches: {e}")
+
+def load_locations(path):
+    """Load the location list from the pipeline's JSON/NDJSON output ('-' for stdin)"""
+    return read_locations(path)
+
+def connect_mysql(local_infile=False):
+    return mysql.connector.connect(
         host=os.getenv("DB_HOST"),
         port=int(os.getenv("DB_PORT", 3306)),  # Default to 3306 if not set
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
+        database=os.getenv("DB_NAME"),
+        allow_local_infile=local_infile
     )
-    
+
+def connect_sqlite(path):
+    """Open (and if needed create) a local SQLite copy of vending_locations"""
+    conn = sqlite3.connect(path)
+    conn.execute(SQLITE_SCHEMA)
+    for statement in SQLITE_INDEXES:
+        conn.execute(statement)
+    return conn
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def fetch_existing_ids(cursor):
+    cursor.execute("SELECT id FROM vending_locations")
+    return {row[0] for row in cursor.fetchall()}
+
+def import_row_by_row(conn, locations):
+    """Original mode: one upsert and one log line per location, single commit"""
     cursor = conn.cursor()
-    
-    # Insert/Update query
-    insert_query = """
-    INSERT INTO vending_locations (
-        id, retailer, machine_id, name, address, city, state, zip_code,
-        latitude, longitude, type, last_verified, is_active
-    ) VALUES (
-        %(id)s, %(retailer)s, %(machine_id)s, %(name)s, %(address)s, %(city)s,
-        %(state)s, %(zip_code)s, %(latitude)s, %(longitude)s, %(type)s,
-        %(last_verified)s, %(is_active)s
-    ) ON DUPLICATE KEY UPDATE
-        retailer = VALUES(retailer),
-        machine_id = VALUES(machine_id),
-        name = VALUES(name),
-        address = VALUES(address),
-        city = VALUES(city),
-        state = VALUES(state),
-        zip_code = VALUES(zip_code),
-        latitude = VALUES(latitude),
-        longitude = VALUES(longitude),
-        type = VALUES(type),
-        last_verified = VALUES(last_verified),
-        is_active = VALUES(is_active);
-    """
-    
     inserted = 0
     updated = 0
     errors = 0
-    
+
     for loc in locations:
         try:
-            cursor.execute(insert_query, loc)
+            cursor.execute(INSERT_QUERY, loc)
             if cursor.rowcount == 1:
                 inserted += 1
                 print(f"✅ Inserted: {loc['id']}")
@@ -62,28 +149,260 @@ try:
         except Exception as e:
             errors += 1
             print(f"⚠️ Error with {loc.get('id')}: {e}")
-    
+
     # Commit all changes
     conn.commit()
-    
-    print("\n=== Import Summary ===")
-    print(f"✅ Inserted: {inserted}")
-    print(f"🔄 Updated:  {updated}")
-    print(f"⚠️ Errors:   {errors}")
-    print("======================")
-    
-except mysql.connector.Error as db_error:
-    print(f"❌ Database connection error: {db_error}")
-except FileNotFoundError:
-    print("❌ Could not find data/complete_locations.json file")
-except json.JSONDecodeError as json_error:
-    print(f"❌ JSON parsing error: {json_error}")
-except Exception as e:
-    print(f"❌ Unexpected error: {e}")
-finally:
-    # Clean up connections
-    if 'cursor' in locals():
+    cursor.close()
+    return inserted, updated, errors
+
+def _mysql_batch_query(size):
+    placeholders = "(" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+    return (
+        f"INSERT INTO vending_locations ({', '.join(COLUMNS)}) VALUES "
+        + ", ".join([placeholders] * size)
+        + " " + MYSQL_ON_DUPLICATE
+    )
+
+def _write_batch(conn, cursor, batch, dialect):
+    """Upsert one batch and return the driver's affected-row count"""
+    if dialect == "sqlite":
+        cursor.executemany(SQLITE_UPSERT_QUERY, [{col: loc.get(col) for col in COLUMNS} for loc in batch])
+    else:
+        params = [loc.get(col) for loc in batch for col in COLUMNS]
+        cursor.execute(_mysql_batch_query(len(batch)), params)
+    affected = cursor.rowcount
+    conn.commit()
+    return affected
+
+def import_bulk(conn, locations, batch_size=DEFAULT_BATCH_SIZE, dialect="mysql"):
+    """Upsert in multi-row batches with a commit per batch.
+
+    A batch that fails is retried row by row so one bad record doesn't
+    drop its neighbours. Returns (inserted, updated, errors).
+    """
+    cursor = conn.cursor()
+    existing = fetch_existing_ids(cursor)
+    new_ids = {loc["id"] for loc in locations} - existing
+    errors = 0
+    affected = 0
+    total_batches = (len(locations) + batch_size - 1) // batch_size
+
+    for number, batch in enumerate(batched(locations, batch_size), 1):
+        try:
+            affected += _write_batch(conn, cursor, batch, dialect)
+        except Exception as e:
+            conn.rollback()
+            print(f"\n⚠️ Batch {number} failed ({e}); retrying row by row")
+            for loc in batch:
+                try:
+                    affected += _write_batch(conn, cursor, [loc], dialect)
+                except Exception as row_error:
+                    conn.rollback()
+                    errors += 1
+                    new_ids.discard(loc.get("id"))
+                    print(f"⚠️ Error with {loc.get('id')}: {row_error}")
+        print(f"\r⏳ Batch {number}/{total_batches} committed", end="", flush=True)
+    print()
+
+    cursor.close()
+    inserted = len(new_ids)
+    if dialect == "sqlite":
+        # SQLite counts every upserted row once, changed or not
+        updated = len(locations) - errors - inserted
+    else:
+        # MySQL reports 1 per inserted row and 2 per changed row
+        updated = max(0, (affected - inserted) // 2)
+    return inserted, updated, errors
+
+# Characters LOAD DATA's ESCAPED BY '\\' treats specially inside a field
+LOAD_DATA_ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+
+def load_data_field(value):
+    """One LOAD DATA field: \\N for NULL, anything else with its special characters escaped"""
+    if value is None:
+        return "\\N"  # must stay unescaped, or MySQL loads the literal text \N
+    if isinstance(value, bool):
+        return str(int(value))
+    return "".join(LOAD_DATA_ESCAPES.get(char, char) for char in str(value))
+
+def load_data_line(loc):
+    return "\t".join(load_data_field(loc.get(col)) for col in COLUMNS) + "\n"
+
+def import_load_data(conn, locations):
+    """Stage rows with LOAD DATA LOCAL INFILE, then upsert them in one statement"""
+    cursor = conn.cursor()
+    existing = fetch_existing_ids(cursor)
+    inserted = len({loc["id"] for loc in locations} - existing)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, newline="", encoding="utf-8") as f:
+        f.writelines(load_data_line(loc) for loc in locations)
+        staging_path = f.name
+
+    try:
+        cursor.execute("CREATE TEMPORARY TABLE vending_locations_staging LIKE vending_locations")
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE '{staging_path.replace(os.sep, '/')}' "
+            "INTO TABLE vending_locations_staging "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(COLUMNS)})"
+        )
+        cursor.execute(
+            f"INSERT INTO vending_locations ({', '.join(COLUMNS)}) "
+            f"SELECT {', '.join(COLUMNS)} FROM vending_locations_staging "
+            + MYSQL_ON_DUPLICATE
+        )
+        affected = cursor.rowcount
+        conn.commit()
+        cursor.execute("DROP TEMPORARY TABLE vending_locations_staging")
+    finally:
         cursor.close()
-    if 'conn' in locals() and conn.is_connected():
-        conn.close()
-        print("Database connection closed.")
\ No newline at end of file
+        os.remove(staging_path)
+
+    return inserted, max(0, (affected - inserted) // 2), 0
+
+def deactivate(conn, ids, batch_size=DEFAULT_BATCH_SIZE, dialect="mysql"):
+    """Mark machines that disappeared from the source as inactive"""
+    cursor = conn.cursor()
+    marker = "?" if dialect == "sqlite" else "%s"
+    for batch in batched(ids, batch_size):
+        cursor.execute(
+            f"UPDATE vending_locations SET is_active = {marker} "
+            f"WHERE id IN ({', '.join([marker] * len(batch))})",
+            [False] + list(batch)
+        )
+        conn.commit()
+    cursor.close()
+
+def import_incremental(conn, locations, batch_size=DEFAULT_BATCH_SIZE, dialect="mysql",
+                       dry_run=False, diff_out=None):
+    """Write only new, changed and disappeared rows.
+
+    Returns (inserted, updated, errors, deactivated).
+    """
+    cursor = conn.cursor()
+    stored_hashes, stored_active = fetch_stored_state(cursor)
+    cursor.close()
+
+    diff = diff_locations(locations, stored_hashes, stored_active)
+    print(f"🔍 Diff: {len(diff['inserts'])} new, {len(diff['updates'])} changed, "
+          f"{len(diff['deactivations'])} gone, {diff['unchanged']} unchanged")
+
+    if diff_out:
+        with open(diff_out, "w", encoding="utf-8") as f:
+            json.dump(diff, f, indent=2, ensure_ascii=False)
+        print(f"💾 Diff saved to {diff_out}")
+
+    if dry_run:
+        return 0, 0, 0, 0
+
+    changed = diff["inserts"] + diff["updates"]
+    inserted, updated, errors = (0, 0, 0)
+    if changed:
+        inserted, updated, errors = import_bulk(conn, changed, batch_size, dialect)
+    if diff["deactivations"]:
+        deactivate(conn, diff["deactivations"], batch_size, dialect)
+    return inserted, updated, errors, len(diff["deactivations"])
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Upsert locations into vending_locations")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="JSON or NDJSON file of locations, '-' for stdin")
+    parser.add_argument("--bulk", action="store_true",
+                        help="multi-row upserts with a commit per batch and summary-only output")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows per batch in --bulk mode (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--load-data", action="store_true",
+                        help="stage rows with LOAD DATA LOCAL INFILE (MySQL only)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only write rows whose content changed and deactivate missing ones")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="with --incremental, report the diff without writing")
+    parser.add_argument("--diff-out", metavar="PATH",
+                        help="with --incremental, save the computed diff as JSON")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="import into a local SQLite database instead of MySQL")
+    parser.add_argument("--apply-merges", metavar="PATH",
+                        help="apply dedup_locations.py merge suggestions: import survivors, deactivate the rest, "
+                             "and record them in --merges-file")
+    parser.add_argument("--merges-file", default=DEFAULT_MERGES_FILE, metavar="PATH",
+                        help=f"merge decisions re-applied on every import (default {DEFAULT_MERGES_FILE})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = None
+
+    try:
+        # Load JSON file
+        locations = load_locations(args.input)
+        merged_away = []
+        merges = load_suggestions(args.merges_file) if os.path.exists(args.merges_file) else []
+        if args.apply_merges:
+            merges = combine_suggestions(merges, load_suggestions(args.apply_merges))
+        if merges:
+            locations, merged_away = apply_merge_suggestions(locations, merges)
+            print(f"🧹 Merged away {len(merged_away)} duplicate locations")
+
+        if args.sqlite:
+            if args.load_data:
+                print("❌ --load-data needs MySQL; drop --sqlite or --load-data")
+                return
+            conn = connect_sqlite(args.sqlite)
+        else:
+            # Connect to MySQL
+            conn = connect_mysql(local_infile=args.load_data)
+
+        started = time.perf_counter()
+        deactivated = 0
+        if args.incremental:
+            dialect = "sqlite" if args.sqlite else "mysql"
+            inserted, updated, errors, deactivated = import_incremental(
+                conn, locations, args.batch_size, dialect, args.dry_run, args.diff_out
+            )
+        elif args.load_data:
+            inserted, updated, errors = import_load_data(conn, locations)
+        elif args.bulk or args.sqlite:
+            dialect = "sqlite" if args.sqlite else "mysql"
+            inserted, updated, errors = import_bulk(conn, locations, args.batch_size, dialect)
+        else:
+            inserted, updated, errors = import_row_by_row(conn, locations)
+        if merged_away and not args.incremental:
+            # The incremental diff already deactivates rows missing from the input
+            deactivate(conn, merged_away, args.batch_size, "sqlite" if args.sqlite else "mysql")
+            deactivated = len(merged_away)
+        elapsed = time.perf_counter() - started
+
+        print("\n=== Import Summary ===")
+        print(f"✅ Inserted: {inserted}")
+        print(f"🔄 Updated:  {updated}")
+        print(f"⚠️ Errors:   {errors}")
+        if args.incremental or merged_away:
+            print(f"💤 Deactivated: {deactivated}")
+        print(f"⏱️ Time:     {elapsed:.2f}s for {len(locations)} rows")
+        print("======================")
+
+        if args.apply_merges and not args.dry_run:
+            save_suggestions(args.merges_file, merges)
+            print(f"💾 Merge decisions saved to {args.merges_file}; later imports re-apply them")
+
+        if (inserted or updated or deactivated) and not args.sqlite:
+            notify_api()
+
+    except mysql.connector.Error as db_error:
+        print(f"❌ Database connection error: {db_error}")
+    except FileNotFoundError:
+        print(f"❌ Could not find {args.input} file")
+    except json.JSONDecodeError as json_error:
+        print(f"❌ JSON parsing error: {json_error}")
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+    finally:
+        # Clean up connections
+        if conn is not None:
+            if isinstance(conn, sqlite3.Connection):
+                conn.close()
+            elif conn.is_connected():
+                conn.close()
+            print("Database connection closed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# scripts/location_diff.py
+import hashlib
+import json
+
+# Columns compared when deciding whether a stored row changed
+HASHED_COLUMNS = [
+    "retailer", "machine_id", "name", "address", "city", "state", "zip_code",
+    "latitude", "longitude", "type", "last_verified", "is_active"
+]
+
+def normalize_value(column, value):
+    """Put JSON values and DB values (Decimal, date, tinyint) in one canonical form"""
+    if column in ("latitude", "longitude"):
+        # DECIMAL(10,8)/(11,8) keeps 8 places; compare at the same precision
+        return None if value is None else f"{float(value):.8f}"
+    if column == "last_verified":
+        return None if value is None else str(value)[:10]
+    if column == "is_active":
+        return None if value is None else int(bool(value))
+    return "" if value is None else str(value)
+
+def record_hash(location):
+    """Stable hash of the stored columns of a location"""
+    canonical = [normalize_value(col, location.get(col)) for col in HASHED_COLUMNS]
+    return hashlib.sha1(json.dumps(canonical).encode("utf-8")).hexdigest()
+
+def diff_locations(locations, stored_hashes, stored_active_ids):
+    """Compare incoming locations with what the table already holds.
+
+    `stored_hashes` maps id -> record_hash of the stored row and
+    `stored_active_ids` is the set of ids currently marked active. Returns a
+    dict with `inserts` and `updates` (location dicts to upsert),
+    `deactivations` (ids no longer in the source) and an `unchanged` count.
+    """
+    incoming = {}
+    for loc in locations:
+        incoming[loc["id"]] = loc  # repeated ids: last one wins, like the upsert
+
+    inserts = []
+    updates = []
+    unchanged = 0
+    for location_id, loc in incoming.items():
+        stored = stored_hashes.get(location_id)
+        if stored is None:
+            inserts.append(loc)
+        elif stored != record_hash(loc):
+            updates.append(loc)
+        else:
+            unchanged += 1
+
+    deactivations = sorted(stored_active_ids - incoming.keys())
+    return {
+        "inserts": inserts,
+        "updates": updates,
+        "deactivations": deactivations,
+        "unchanged": unchanged,
+    }
+
+def fetch_stored_state(cursor):
+    """Hashes of every stored row plus the ids currently active"""
+    cursor.execute(f"SELECT id, {', '.join(HASHED_COLUMNS)} FROM vending_locations")
+    hashes = {}
+    active = set()
+    for row in cursor.fetchall():
+        stored = dict(zip(["id"] + HASHED_COLUMNS, row))
+        hashes[stored["id"]] = record_hash(stored)
+        if stored["is_active"]:
+            active.add(stored["id"])
+    return hashes, active
@@ -0,0 +1,107 @@
+# scripts/location_store.py
+import json
+import os
+from pathlib import Path
+from convert_data_to_jsonformat import read_locations
+
+class LocationStore:
+    """A location JSON file held in memory with O(1) lookup by id.
+
+    Edits are appended to `<file>.journal` (one small NDJSON line each)
+    instead of rewriting the whole file. The file itself is rewritten
+    atomically every `save_every` edits and on save()/close(). A journal
+    left behind by a crash is replayed and saved when the store is opened
+    again.
+    """
+
+    def __init__(self, path, save_every=50):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.save_every = save_every
+        self.unsaved = 0
+        self.locations = read_locations(self.path)
+
+        # Repeated ids all point at their records so an edit reaches each copy
+        self.by_id = {}
+        for location in self.locations:
+            self.by_id.setdefault(location.get("id"), []).append(location)
+
+        self.journal = None
+        replayed = self._replay_journal()
+        if replayed:
+            # Fold the recovered edits into the file and start a clean journal
+            self.save()
+            print(f"↩️ Recovered {replayed} unsaved edits from {self.journal_path}")
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __iter__(self):
+        return iter(self.locations)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, location_id):
+        """The location with this id, or None"""
+        records = self.by_id.get(location_id)
+        return records[-1] if records else None
+
+    def update(self, location_id, **fields):
+        """Change fields of a location and journal the edit; False if the id is unknown"""
+        if location_id not in self.by_id:
+            return False
+        self._apply(location_id, fields)
+
+        if self.journal is None:
+            self.journal = open(self.journal_path, "a", encoding="utf-8")
+        self.journal.write(json.dumps({"id": location_id, "fields": fields}, ensure_ascii=False) + "\n")
+        self.journal.flush()
+
+        self.unsaved += 1
+        if self.unsaved >= self.save_every:
+            self.save()
+        return True
+
+    def save(self):
+        """Rewrite the JSON file atomically and clear the journal"""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.locations, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self.unsaved = 0
+
+    def close(self):
+        if self.unsaved:
+            self.save()
+        elif self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def _apply(self, location_id, fields):
+        for location in self.by_id[location_id]:
+            location.update(fields)
+
+    def _replay_journal(self):
+        if not self.journal_path.exists():
+            return 0
+        replayed = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line
+                if entry.get("id") in self.by_id:
+                    self._apply(entry["id"], entry["fields"])
+                    replayed += 1
+        return replayed
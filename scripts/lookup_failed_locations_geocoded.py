@@ -1,24 +1,18 @@
 # scripts/manual_geocode_updater.py
-import json
 import webbrowser
 import urllib.parse
 from pathlib import Path
+from geocode_cache import GeocodeCache
+from location_store import LocationStore
 
 # FIXED: Read from the GEOCODED file, not the original
 DATA_FILE = Path("data/locations_geocoded.json")  # ← CHANGED THIS LINE
 
 def load_data():
-    """Load the geocoded data (with good coordinates)"""
+    """Load the geocoded data (with good coordinates) into an id-indexed store"""
     if not DATA_FILE.exists():
         raise FileNotFoundError(f"{DATA_FILE} not found")
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def save_data(data):
-    """Save updated data back to the same file"""
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved updates to {DATA_FILE}")
+    return LocationStore(DATA_FILE)
 
 def open_in_maps(address: str):
     """Open a full address in Google Maps"""
@@ -27,22 +21,18 @@ def open_in_maps(address: str):
     webbrowser.open(url)
     print(f"🌍 Opening Google Maps for: {address}")
 
-def find_location(data, location_id):
-    """Find a location entry by ID"""
-    for entry in data:
-        if entry.get("id") == location_id:
-            return entry
-    return None
-
-if __name__ == "__main__":
-    data = load_data()
+def set_coords(data, location_id, lat, lon):
+    """Journal new coordinates; the file itself is rewritten in batches"""
+    data.update(location_id, latitude=lat, longitude=lon)
 
+def run_lookup_loop(data, cache):
+    """Prompt for location IDs and record coordinates until 'quit'"""
     while True:
         location_id = input("\nEnter location ID (or 'quit' to stop): ").strip()
         if location_id.lower() in ["quit", "exit"]:
             break
 
-        location = find_location(data, location_id)
+        location = data.get(location_id)
         if not location:
             print(f"❌ No location found for ID: {location_id}")
             continue
@@ -59,6 +49,14 @@ if __name__ == "__main__":
             print("⚠️ No address available for this entry.")
             continue
 
+        # Step 0: Reuse coordinates someone already resolved for this address
+        ungeocoded = location.get("latitude") == 0.0 and location.get("longitude") == 0.0
+        cached = ungeocoded and cache.get(location.get("address"), location.get("city"), location.get("state"))
+        if cached:
+            set_coords(data, location_id, *cached)
+            print(f"📦 Used cached coords for {location_id}: ({cached[0]}, {cached[1]})")
+            continue
+
         # Step 1: Open Google Maps
         open_in_maps(full_address)
 
@@ -67,11 +65,21 @@ if __name__ == "__main__":
         if coords:
             try:
                 lat_str, lon_str = [c.strip() for c in coords.split(",")]
-                location["latitude"] = float(lat_str)
-                location["longitude"] = float(lon_str)
-                save_data(data)
+                set_coords(data, location_id, float(lat_str), float(lon_str))
+                cache.put(location.get("address"), location.get("city"), location.get("state"),
+                          location["latitude"], location["longitude"], source="manual")
                 print(f"✅ Updated {location_id} with coords ({lat_str}, {lon_str})")
             except Exception as e:
                 print(f"⚠️ Invalid coordinates format: {e}")
         else:
-            print("ℹ️ Skipped updating coordinates.")
\ No newline at end of file
+            print("ℹ️ Skipped updating coordinates.")
+
+if __name__ == "__main__":
+    data = load_data()
+    cache = GeocodeCache()
+
+    try:
+        run_lookup_loop(data, cache)
+    finally:
+        data.close()
+        print(f"✅ Saved updates to {DATA_FILE}")
\ No newline at end of file
@@ -3,6 +3,8 @@ import json
 import webbrowser
 import urllib.parse
 from pathlib import Path
+from geocode_cache import GeocodeCache
+from location_store import LocationStore
 
 # Configuration - Update these paths to match your files
 COMPLETE_LOCATIONS_FILE = "data/complete_locations.json"
@@ -10,13 +12,12 @@ FAILED_LOCATIONS_FILE = "data/new_failed_geocodes.txt"
 MANUAL_UPDATES_FILE = "data/manual_updates.json"
 
 def load_locations():
-    """Load all locations from the complete file"""
+    """Load all locations from the complete file into an id-indexed store"""
     try:
-        with open(COMPLETE_LOCATIONS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return LocationStore(COMPLETE_LOCATIONS_FILE)
     except FileNotFoundError:
         print(f"Error: {COMPLETE_LOCATIONS_FILE} not found")
-        return []
+        return None
 
 def find_failed_locations(all_locations):
     """Find locations with 0.0 coordinates"""
@@ -35,24 +36,43 @@ def open_in_maps(address):
     webbrowser.open(url)
     print(f"🌍 Opening Google Maps for: {address}")
 
+def load_manual_updates():
+    """Manual updates saved by earlier runs, or [] if there are none"""
+    try:
+        with open(MANUAL_UPDATES_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
 def save_manual_updates(updates):
     """Save manual updates to a file"""
     with open(MANUAL_UPDATES_FILE, 'w', encoding='utf-8') as f:
         json.dump(updates, f, indent=2, ensure_ascii=False)
     print(f"💾 Saved manual updates to {MANUAL_UPDATES_FILE}")
 
-def update_locations(all_locations, updates):
-    """Update locations with new coordinates"""
+def update_locations(store, updates):
+    """Apply saved manual updates through the LocationStore in one pass.
+
+    Updates are matched by 'id', or by name + address for older entries
+    in manual_updates.json that predate the id field. Like the store, a
+    repeated id or name + address resolves to its last record, and an
+    edit reaches every copy of that id. Returns how many locations changed.
+    """
+    by_name_address = {}
+    for location in store:
+        by_name_address[(location.get('name'), location.get('address'))] = location
+
     updated_count = 0
     for update in updates:
-        for location in all_locations:
-            # Match by a unique identifier - adjust this based on your data structure
-            if (location.get('name') == update['name'] and 
-                location.get('address') == update.get('address')):
-                location['latitude'] = update['lat']
-                location['longitude'] = update['lng']
-                updated_count += 1
-                break
+        if 'id' in update:
+            location = store.get(update['id'])
+        else:
+            location = by_name_address.get((update['name'], update.get('address')))
+        if location is None:
+            continue
+        if (location.get('latitude'), location.get('longitude')) != (update['lat'], update['lng']):
+            store.update(location['id'], latitude=update['lat'], longitude=update['lng'])
+            updated_count += 1
     return updated_count
 
 def main():
@@ -62,6 +82,19 @@ def main():
     if not all_locations:
         return
     
+    try:
+        # A regenerated complete file loses earlier manual fixes; put them back first
+        previous_updates = load_manual_updates()
+        reapplied = update_locations(all_locations, previous_updates)
+        if reapplied:
+            print(f"↩️ Re-applied {reapplied} saved manual updates from {MANUAL_UPDATES_FILE}")
+        run_updates(all_locations, previous_updates)
+    finally:
+        # Writes any edits still only in the journal
+        all_locations.close()
+
+def run_updates(all_locations, previous_updates=()):
+    """Prompt for coordinates of every failed location, journaling each one"""
     print(f"📊 Total locations: {len(all_locations)}")
     
     # Find failed locations
@@ -74,6 +107,7 @@ def main():
     
     # Manual update process
     manual_updates = []
+    cache = GeocodeCache()
     
     print("\n" + "="*50)
     print("MANUAL GEOCODING PROCESS")
@@ -90,6 +124,23 @@ def main():
         print(f"\n📍 {i}/{len(failed_locations)}: {name}")
         print(f"   Address: {full_address}")
         
+        # Reuse coordinates already resolved for this address
+        cached = cache.get(address, city, state)
+        if cached:
+            lat, lng = cached
+            all_locations.update(location['id'], latitude=lat, longitude=lng)
+            manual_updates.append({
+                'id': location['id'],
+                'name': name,
+                'address': address,
+                'city': city,
+                'state': state,
+                'lat': lat,
+                'lng': lng
+            })
+            print(f"📦 Using cached coordinates: {lat}, {lng}")
+            continue
+        
         # Open in Google Maps
         open_in_maps(full_address)
         
@@ -104,8 +155,10 @@ def main():
             try:
                 lat, lng = map(float, coords.split(','))
                 
-                # Add to manual updates
+                # Apply right away (journaled) and add to manual updates
+                all_locations.update(location['id'], latitude=lat, longitude=lng)
                 manual_updates.append({
+                    'id': location['id'],
                     'name': name,
                     'address': address,
                     'city': city,
@@ -114,24 +167,21 @@ def main():
                     'lng': lng
                 })
                 
+                cache.put(address, city, state, lat, lng, source='manual')
                 print(f"✅ Added coordinates: {lat}, {lng}")
                 break
                 
             except ValueError:
                 print("❌ Invalid format. Please use: 40.7128, -74.0060")
     
-    # Save manual updates
+    # Save manual updates, keeping those from earlier runs
     if manual_updates:
-        save_manual_updates(manual_updates)
-        
-        # Apply updates to the main data
-        updated_count = update_locations(all_locations, manual_updates)
+        save_manual_updates(list(previous_updates) + manual_updates)
         
         # Save the complete file with updates
-        with open(COMPLETE_LOCATIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(all_locations, f, indent=2, ensure_ascii=False)
+        all_locations.save()
         
-        print(f"\n🎉 Successfully updated {updated_count} locations!")
+        print(f"\n🎉 Successfully updated {len(manual_updates)} locations!")
         print(f"📁 Updated file: {COMPLETE_LOCATIONS_FILE}")
     else:
         print("\nℹ️  No manual updates were made.")
@@ -1,75 +1,150 @@
 # scripts/merge_geocoded_data.py
+import argparse
 import json
 from pathlib import Path
+from convert_data_to_jsonformat import read_locations
+from geocode_cache import DEFAULT_CACHE_PATH, GeocodeCache
 
-def merge_geocoded_data():
-    """Merge the two files to get complete coordinates"""
-    
-    # Load both files
-    auto_file = Path("data/autofilledgeolocations.txt")
-    manual_file = Path("data/manuallyaddedgeolocations.txt")
-    
-    with open(auto_file, 'r', encoding='utf-8') as f:
-        auto_data = json.load(f)
-    
-    with open(manual_file, 'r', encoding='utf-8') as f:
-        manual_data = json.load(f)
-    
-    # Verify both have the same number of locations
-    if len(auto_data) != len(manual_data):
-        print("❌ Files have different numbers of locations!")
-        return
-    
-    # Create the complete dataset
-    complete_data = []
-    
-
-    for i in range(len(auto_data)):
-        auto_loc = auto_data[i]
-        manual_loc = manual_data[i]
-        
-        # They should have the same ID
-        if auto_loc['id'] != manual_loc['id']:
-            print(f"❌ ID mismatch at index {i}: {auto_loc['id']} vs {manual_loc['id']}")
-            continue
-        
-        # Create merged location - start with auto data
-        merged_loc = auto_loc.copy()
-        
-        # If auto has coordinates, use them
-        if auto_loc['latitude'] != 0.0 and auto_loc['longitude'] != 0.0:
-            # Already has coordinates from auto-geocoding
-            pass
-        # Else if manual has coordinates, use them
-        elif manual_loc['latitude'] != 0.0 and manual_loc['longitude'] != 0.0:
-            merged_loc['latitude'] = manual_loc['latitude']
-            merged_loc['longitude'] = manual_loc['longitude']
+# File sources by name; "cache" is the geocode cache, looked up by address
+DEFAULT_SOURCES = {
+    "manual": "data/manuallyaddedgeolocations.txt",
+    "auto": "data/autofilledgeolocations.txt",
+}
+DEFAULT_PRECEDENCE = ["manual", "cache", "auto"]
+
+# Candidates further apart than this (~100 m) are reported as conflicts
+CONFLICT_TOLERANCE_DEG = 0.001
+
+def has_coords(loc):
+    return bool(loc.get('latitude')) and bool(loc.get('longitude'))
+
+def index_source(path):
+    """Read a location file into {id: record}; later duplicates win"""
+    return {loc['id']: loc for loc in read_locations(path)}
+
+def merge_sources(indexes, precedence, cache=None, tolerance=CONFLICT_TOLERANCE_DEG):
+    """ID-keyed N-way merge of location sources.
+
+    `indexes` maps source name -> {id: record}. For every id, coordinates
+    come from the first source in `precedence` that has non-zero ones; the
+    other fields come from the highest-precedence file source holding the
+    id. Output order follows first appearance, scanning the lowest
+    precedence file first (the auto file, as before). Runs in linear time
+    and doesn't depend on the sources being aligned.
+
+    Returns (merged records, {source: count used}, conflicts).
+    """
+    file_order = [name for name in precedence if name in indexes]
+    ordered_ids = {}
+    for name in reversed(file_order):
+        for location_id in indexes[name]:
+            ordered_ids.setdefault(location_id, None)
+
+    merged = []
+    used = {name: 0 for name in precedence}
+    used["missing"] = 0
+    conflicts = []
+
+    for location_id in ordered_ids:
+        base = next(indexes[name][location_id] for name in file_order if location_id in indexes[name])
+        merged_loc = base.copy()
+
+        candidates = {}
+        for name in precedence:
+            if name == "cache":
+                if cache is not None:
+                    coords = cache.get(base.get('address'), base.get('city'), base.get('state'))
+                    if coords:
+                        candidates[name] = coords
+            elif location_id in indexes.get(name, {}) and has_coords(indexes[name][location_id]):
+                record = indexes[name][location_id]
+                candidates[name] = (record['latitude'], record['longitude'])
+
+        if candidates:
+            chosen = next(name for name in precedence if name in candidates)
+            merged_loc['latitude'], merged_loc['longitude'] = candidates[chosen]
+            used[chosen] += 1
+
+            lat, lng = candidates[chosen]
+            if any(abs(lat - c_lat) > tolerance or abs(lng - c_lng) > tolerance
+                   for c_lat, c_lng in candidates.values()):
+                conflicts.append({
+                    'id': location_id,
+                    'chosen': chosen,
+                    'candidates': {name: list(coords) for name, coords in candidates.items()},
+                })
         else:
-            # Both have 0.0 - this shouldn't happen!
-            print(f"❌ Both files have 0.0 for {auto_loc['id']}")
-        
-        complete_data.append(merged_loc)
-    
+            used["missing"] += 1
+
+        merged.append(merged_loc)
+
+    return merged, used, conflicts
+
+def parse_source(value):
+    name, _, path = value.partition('=')
+    if not name or not path:
+        raise argparse.ArgumentTypeError("source must be NAME=PATH")
+    return name, path
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Merge geocoded location sources by id")
+    parser.add_argument('--source', type=parse_source, action='append', default=[], metavar='NAME=PATH',
+                        help="add or replace a file source (defaults: manual=..., auto=...)")
+    parser.add_argument('--precedence', default=",".join(DEFAULT_PRECEDENCE),
+                        help="comma-separated source order, highest first (default manual,cache,auto)")
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH), help="geocode cache used as the 'cache' source")
+    parser.add_argument('--output', default="data/complete_locations.json")
+    parser.add_argument('--conflicts-out', help="write conflicting coordinates to this JSON file")
+    return parser.parse_args(argv)
+
+def merge_geocoded_data(argv=None):
+    """Merge the geocoded sources to get complete coordinates"""
+    args = parse_args(argv)
+    precedence = [name.strip() for name in args.precedence.split(',') if name.strip()]
+    sources = dict(DEFAULT_SOURCES)
+    sources.update(dict(args.source))
+
+    # Stream each file source into an id index
+    indexes = {}
+    for name in precedence:
+        if name in sources:
+            indexes[name] = index_source(sources[name])
+            print(f"📂 {name}: {len(indexes[name])} locations from {sources[name]}")
+
+    cache = None
+    if "cache" in precedence and Path(args.cache).exists():
+        cache = GeocodeCache(args.cache)
+
+    complete_data, used, conflicts = merge_sources(indexes, precedence, cache)
+
     # Save the complete dataset
-    output_file = Path("data/complete_locations.json")
+    output_file = Path(args.output)
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(complete_data, f, indent=2, ensure_ascii=False)
-    
+
+    if args.conflicts_out:
+        with open(args.conflicts_out, 'w', encoding='utf-8') as f:
+            json.dump(conflicts, f, indent=2, ensure_ascii=False)
+
     # Count results
-    complete_count = sum(1 for loc in complete_data if loc['latitude'] != 0.0)
+    complete_count = sum(1 for loc in complete_data if has_coords(loc))
     total_count = len(complete_data)
-    
+
     print(f"✅ Merge complete!")
     print(f"   Total locations: {total_count}")
     print(f"   With coordinates: {complete_count}")
     print(f"   Missing coordinates: {total_count - complete_count}")
+    print(f"   Coordinates by source: " + ", ".join(f"{name}={count}" for name, count in used.items()))
+    print(f"   Conflicts: {len(conflicts)}")
     print(f"   Saved to: {output_file}")
-    
-    # Verify we got all 1,632 with coordinates
-    if complete_count == 1632:
-        print("🎉 ALL 1,632 LOCATIONS HAVE COORDINATES!")
+
+    for conflict in conflicts[:5]:
+        print(f"   ⚠️ {conflict['id']}: using {conflict['chosen']} of {conflict['candidates']}")
+
+    if complete_count == total_count:
+        print(f"🎉 ALL {total_count:,} LOCATIONS HAVE COORDINATES!")
     else:
-        print(f"❌ Still missing {1632 - complete_count} coordinates")
+        print(f"❌ Still missing {total_count - complete_count} coordinates")
 
 if __name__ == "__main__":
-    merge_geocoded_data()
\ No newline at end of file
+    merge_geocoded_data()
@@ -0,0 +1,82 @@
+import datetime
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import main
+from backend.app.cache import dataset_cache
+from backend.app.models import Base, VendingLocation
+from backend.app.singleflight import coalescer
+
+# The pipeline scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """SQLite copy of vending_locations loaded from data/complete_locations.json"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'vending.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with open('data/complete_locations.json', 'r') as f:
+        locations = json.load(f)
+    # The file repeats a few ids; like the MySQL upsert, the last one wins
+    rows = {loc['id']: dict(loc, last_verified=datetime.date.fromisoformat(loc['last_verified']))
+            for loc in locations}
+    with factory() as db:
+        db.add_all(VendingLocation(**row) for row in rows.values())
+        db.commit()
+
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    """API test client backed by the SQLite fixture database"""
+    db_url = session_factory.kw['bind'].url
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_url.database}")
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    main.app.dependency_overrides[main.get_db] = override_get_db
+    main.app.dependency_overrides[main.get_async_db] = override_get_async_db
+    dataset_cache.__init__()
+    coalescer.__init__()
+    with TestClient(main.app) as test_client:
+        yield test_client
+    main.app.dependency_overrides.clear()
+    dataset_cache.__init__()
+    coalescer.__init__()
+
+
+@pytest.fixture
+def make_location():
+    """Factory for pipeline records: make_location(i, **overrides), Frys stores in Phoenix ~111 m apart"""
+    def make(i, **overrides):
+        location = {
+            "id": f"frys_Q{i:05d}", "retailer": "Frys", "machine_id": f"Q{i:05d}", "name": "Frys",
+            "address": f"{i} Main St", "city": "Phoenix", "state": "AZ", "zip_code": "",
+            "latitude": 33.0 + i / 1000, "longitude": -112.0, "type": "grocery",
+            "last_verified": "2024-01-15", "is_active": True,
+        }
+        location.update(overrides)
+        return location
+    return make
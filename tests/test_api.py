@@ -0,0 +1,117 @@
+import json
+
+
+def test_root(client):
+    assert client.get('/').json() == {"message": "Pokemon Vending Machine API is running!"}
+
+
+def test_debug_count(client):
+    assert client.get('/api/debug-count').json() == {"total_locations": 1627}
+
+
+def test_locations_by_state(client):
+    response = client.get('/api/locations/az')
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 129
+    assert all(loc['state'] == 'AZ' for loc in data)
+
+
+def test_nearby_route_is_not_shadowed_by_state(client):
+    response = client.get('/api/locations/nearby', params={'lat': 33.45, 'lng': -112.07, 'radius_km': 5})
+    assert response.status_code == 200
+    distances = [loc['distance_km'] for loc in response.json()]
+    assert distances and distances == sorted(distances) and max(distances) <= 5
+
+    for params in ({'radius_km': 8000}, {'radius_km': 0}, {'lat': 95}, {'lng': -200}, {'limit': 0}):
+        query = {'lat': 33.45, 'lng': -112.07, **params}
+        assert client.get('/api/locations/nearby', params=query).status_code == 400
+
+
+def test_locations_paged_by_cursor_with_projection(client):
+    seen = []
+    cursor = None
+    while True:
+        params = {'fields': 'latitude,longitude', 'limit': 500}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get('/api/locations', params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert all(set(loc) == {'id', 'latitude', 'longitude'} for loc in page)
+        seen.extend(loc['id'] for loc in page)
+        cursor = response.headers.get('x-next-cursor')
+        if not cursor:
+            break
+    assert len(seen) == 1627
+    assert seen == sorted(seen)
+
+
+def test_state_list_is_capped_and_validated(client, monkeypatch):
+    monkeypatch.setattr('backend.app.pagination.MAX_PAGE_SIZE', 50)
+    response = client.get('/api/locations/az', params={'limit': 1000})
+    assert len(response.json()) == 50
+    assert response.headers['x-next-cursor']
+
+    following = client.get('/api/locations/az', params={'cursor': response.headers['x-next-cursor']}).json()
+    assert len(following) == 50
+    assert following[0]['id'] > response.json()[-1]['id']
+
+    assert client.get('/api/locations/az', params={'fields': 'secret'}).status_code == 400
+    for cursor in ('!!!', 'Zm9v!', 'Zm9v/', 'a', '_w'):  # not the URL-safe alphabet, bad length, not UTF-8
+        assert client.get('/api/locations/az', params={'cursor': cursor}).status_code == 400
+    assert client.get('/api/locations/az', params={'limit': 0}).status_code == 400
+    assert client.get('/api/locations', params={'limit': 5, 'format': 'msgpack'}).status_code == 400
+
+
+def test_ndjson_stream_returns_every_row(client, monkeypatch):
+    monkeypatch.setattr('backend.app.pagination.STREAM_BATCH_SIZE', 100)
+    response = client.get('/api/locations', params={'stream': 'ndjson', 'fields': 'state'})
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 1627
+    assert set(rows[0]) == {'id', 'state'}
+
+    az = client.get('/api/locations/az', params={'stream': 'ndjson'}).text.splitlines()
+    assert len(az) == 129
+    assert client.get('/api/locations', params={'stream': 'csv'}).status_code == 400
+
+
+def test_route_corridor_endpoint(client):
+    route = [[33.45, -112.07], [32.22, -110.97]]  # Phoenix -> Tucson
+    response = client.post('/api/route', json={'route': route, 'width_km': 10})
+    assert response.status_code == 200
+    hits = response.json()
+    assert hits and all(hit['distance_km'] <= 10 for hit in hits)
+    assert [hit['route_km'] for hit in hits] == sorted(hit['route_km'] for hit in hits)
+
+    assert client.post('/api/route', json={'route': [route[0]]}).status_code == 400
+    assert client.post('/api/route', json={'route': route, 'width_km': 500}).status_code == 400
+    zigzag = [[35.0, -112.0 if leg % 2 else -87.0] for leg in range(400)]
+    assert client.post('/api/route', json={'route': zigzag}).status_code == 400
+
+
+def test_search_endpoint(client):
+    results = client.get('/api/search', params={'q': 'frys phoenix', 'limit': 3}).json()
+    assert len(results) == 3
+    assert all(loc['retailer'] == 'Frys' and loc['city'] == 'Phoenix' for loc in results)
+    assert client.get('/api/search', params={'q': 'x', 'limit': 0}).status_code == 400
+
+
+def test_repeated_requests_are_counted_as_saved(client):
+    for _ in range(3):
+        assert client.get('/api/locations/az', params={'limit': 5}).status_code == 200
+    stats = client.get('/api/debug-cache').json()['coalescing']
+    assert stats['executions'] == 1
+    assert stats['saved'] == 2
+
+
+def test_stats_endpoint(client):
+    response = client.get('/api/stats')
+    stats = response.json()
+    assert stats['total'] == 1627
+    assert stats['states']['AZ']['count'] == 129
+    assert sum(state['count'] for state in stats['states'].values()) == 1627
+    west, south, east, north = stats['states']['AZ']['bbox']
+    assert west < stats['states']['AZ']['centroid'][1] < east
+    assert client.get('/api/stats', headers={'If-None-Match': response.headers['etag']}).status_code == 304
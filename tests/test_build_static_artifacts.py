@@ -0,0 +1,43 @@
+import gzip
+import json
+
+from build_static_artifacts import build_artifacts, load_from_db, load_from_file
+
+
+def read_json(path):
+    return json.loads(path.read_bytes())
+
+
+def test_artifacts_match_the_api(client, session_factory, tmp_path):
+    # Read back from the fixture database so both sides see the same coordinates
+    locations = load_from_db(str(session_factory.kw['bind'].url))
+    manifest = build_artifacts(locations, tmp_path, max_zoom=6)
+    assert read_json(tmp_path / 'manifest.json')['data_version'] == manifest['data_version']
+
+    dataset = manifest['locations']
+    full = tmp_path / dataset['path']
+    assert gzip.decompress((tmp_path / dataset['gzip']['path']).read_bytes()) == full.read_bytes()
+    assert full.read_bytes() == client.get('/api/locations?format=columnar').content
+
+    assert read_json(tmp_path / manifest['stats']['path']) == client.get('/api/stats').json()
+    assert read_json(tmp_path / manifest['states']['AZ']['path']) == client.get('/api/locations/AZ').json()
+
+    tile = manifest['tiles']['path'].format(z=0, x=0, y=0)
+    assert (tmp_path / tile).read_bytes() == client.get('/tiles/0/0/0').content
+
+    clusters = read_json(tmp_path / manifest['clusters']['path'].format(z=0, x=0, y=0))
+    assert sum(cluster['count'] for cluster in clusters) == len(
+        [loc for loc in locations if loc['latitude'] and loc['longitude']])
+
+
+def test_names_change_only_with_content(tmp_path):
+    locations = load_from_file('data/complete_locations.json')
+    first = build_artifacts(locations, tmp_path / 'a', max_zoom=2)
+    assert build_artifacts(locations, tmp_path / 'b', max_zoom=2)['states'] == first['states']
+
+    locations[0] = dict(locations[0], name='Renamed')
+    changed = build_artifacts(locations, tmp_path / 'c', max_zoom=2)
+    state = locations[0]['state']
+    assert changed['states'][state] != first['states'][state]
+    assert all(changed['states'][s] == entry for s, entry in first['states'].items() if s != state)
+    assert changed['locations']['path'] != first['locations']['path']
@@ -0,0 +1,36 @@
+import json
+
+from backend.app.clustering import ClusterIndex
+
+with open('data/complete_locations.json', 'r') as f:
+    LOCATIONS = json.load(f)
+
+INDEX = ClusterIndex(LOCATIONS)
+US_BBOX = (-125.0, 24.0, -66.0, 50.0)
+
+
+def test_every_zoom_accounts_for_every_point():
+    for zoom in range(INDEX.max_zoom + 2):
+        clusters = INDEX.get_clusters(-180, -85, 180, 85, zoom)
+        assert sum(cluster.count for cluster in clusters) == len(LOCATIONS)
+
+
+def test_low_zoom_returns_few_clusters():
+    clusters = INDEX.get_clusters(*US_BBOX, 3)
+    assert len(clusters) < 100
+    assert len(INDEX.get_clusters(*US_BBOX, 17)) == len(LOCATIONS)
+
+
+def test_viewport_filters_to_visible_clusters():
+    # Phoenix metro only
+    clusters = INDEX.get_clusters(-112.5, 33.2, -111.6, 33.8, 10)
+    assert clusters
+    assert all(-112.5 <= c.longitude <= -111.6 and 33.2 <= c.latitude <= 33.8 for c in clusters)
+
+
+def test_clusters_endpoint(client):
+    response = client.get('/api/clusters', params={'bbox': '-125,24,-66,50', 'zoom': 4})
+    assert response.status_code == 200
+    assert sum(item['count'] for item in response.json()) == 1627
+
+    assert client.get('/api/clusters', params={'bbox': '1,2,3', 'zoom': 4}).status_code == 400
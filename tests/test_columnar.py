@@ -0,0 +1,75 @@
+import msgpack
+import pytest
+
+from backend.app.columnar import (
+    COLUMNAR_JSON_TYPE, MSGPACK_TYPE, decode_columns, encode_columns, negotiate_format,
+)
+
+
+def test_roundtrip_preserves_rows():
+    locations = [
+        {'id': 'frys_Q1', 'retailer': 'Frys', 'machine_id': 'Q1', 'name': 'Frys', 'address': '1 Main St',
+         'city': 'Phoenix', 'state': 'AZ', 'zip_code': '', 'latitude': 33.448376, 'longitude': -112.074036,
+         'type': 'grocery', 'last_verified': '2024-01-15', 'is_active': True},
+        {'id': 'frys_Q2', 'retailer': 'Frys', 'machine_id': 'Q2', 'name': 'Frys', 'address': '2 Main St',
+         'city': 'Tempe', 'state': 'AZ', 'zip_code': '', 'latitude': 33.425510, 'longitude': -111.940005,
+         'type': 'grocery', 'last_verified': '2024-01-15', 'is_active': False},
+    ]
+    payload = encode_columns(locations)
+
+    assert payload['columns']['retailer'] == {'dict': ['Frys'], 'codes': [0, 0]}
+    assert payload['columns']['latitude']['deltas'] == [334483760, -228660]
+    assert decode_columns(payload) == locations
+
+
+def test_null_coordinates_roundtrip_as_null():
+    locations = [
+        {'id': f'frys_Q{i}', 'retailer': 'Frys', 'machine_id': f'Q{i}', 'name': 'Frys', 'address': f'{i} Main St',
+         'city': 'Phoenix', 'state': 'AZ', 'zip_code': '', 'latitude': lat, 'longitude': lng,
+         'type': 'grocery', 'last_verified': '2024-01-15', 'is_active': True}
+        for i, (lat, lng) in enumerate([(None, None), (33.5, -112.0), (None, None), (0.0, 0.0), (33.6, None)])
+    ]
+    payload = encode_columns(locations)
+
+    assert payload['columns']['latitude']['nulls'] == [0, 2]
+    assert payload['columns']['latitude']['deltas'] == [0, 335000000, 0, -335000000, 336000000]
+    assert decode_columns(payload) == locations
+
+
+def assert_same_rows(decoded, rows):
+    assert len(decoded) == len(rows)
+    for got, expected in zip(decoded, rows):
+        # Coordinates are rounded to 1e-7 degrees (~1 cm)
+        assert got['latitude'] == pytest.approx(expected['latitude'], abs=1e-7)
+        assert got['longitude'] == pytest.approx(expected['longitude'], abs=1e-7)
+        strip = lambda row: {k: v for k, v in row.items() if k not in ('latitude', 'longitude')}
+        assert strip(got) == strip(expected)
+
+
+def test_negotiation_prefers_query_parameter():
+    assert negotiate_format(None, None) == 'json'
+    assert negotiate_format(None, 'text/html, */*') == 'json'
+    assert negotiate_format(None, MSGPACK_TYPE) == 'msgpack'
+    assert negotiate_format(None, COLUMNAR_JSON_TYPE) == 'columnar'
+    assert negotiate_format('json', MSGPACK_TYPE) == 'json'
+    assert negotiate_format('arrow', None) is None
+
+
+def test_columnar_endpoint_matches_json(client):
+    rows = client.get('/api/locations').json()
+
+    columnar = client.get('/api/locations?format=columnar')
+    assert columnar.headers['content-type'] == COLUMNAR_JSON_TYPE
+    assert 'Accept' in columnar.headers['vary']
+    assert_same_rows(decode_columns(columnar.json()), rows)
+
+    packed = client.get('/api/locations', headers={'Accept': MSGPACK_TYPE})
+    assert packed.headers['content-type'] == MSGPACK_TYPE
+    assert_same_rows(decode_columns(msgpack.unpackb(packed.content)), rows)
+
+    # Several times smaller than the row-wise JSON before compression
+    assert len(packed.content) * 3 < len(client.get('/api/locations').content)
+
+
+def test_unknown_format_is_406(client):
+    assert client.get('/api/locations?format=xml').status_code == 406
@@ -0,0 +1,41 @@
+import io
+import json
+
+from convert_data_to_jsonformat import (
+    convert_text_to_json, iter_locations, parse_line, read_locations, write_json_array, write_ndjson,
+)
+
+RAW = "Frys\tQ00350\t150 E Old West Hwy\tApache Junction, AZ\n\nnot a location\nSafeway  Q01234  1 Main St  Tempe\n"
+
+
+def test_parse_line():
+    loc = parse_line("Frys\tQ00350\t150 E Old West Hwy\tApache Junction, AZ")
+    assert (loc["id"], loc["city"], loc["state"], loc["type"]) == ("frys_Q00350", "Apache Junction", "AZ", "grocery")
+    assert parse_line("   ") is None
+    assert parse_line("only  two") is None
+
+
+def test_iter_locations_is_lazy():
+    def lines():
+        yield "Frys\tQ1\t1 A St\tMesa, AZ"
+        raise AssertionError("read past the first location")
+
+    assert next(iter_locations(lines()))["machine_id"] == "Q1"
+
+
+def test_streamed_formats_round_trip():
+    expected = convert_text_to_json(RAW)
+    assert [loc["state"] for loc in expected] == ["AZ", "Arizona"]
+
+    ndjson, array = io.StringIO(), io.StringIO()
+    assert write_ndjson(iter_locations(io.StringIO(RAW)), ndjson) == 2
+    assert write_json_array(iter_locations(io.StringIO(RAW)), array) == 2
+    assert [json.loads(line) for line in ndjson.getvalue().splitlines()] == expected
+    assert json.loads(array.getvalue()) == expected
+
+
+def test_read_locations_accepts_json_and_ndjson(tmp_path):
+    locations = convert_text_to_json(RAW)
+    (tmp_path / 'a.json').write_text(json.dumps(locations, indent=2))
+    (tmp_path / 'a.ndjson').write_text("".join(json.dumps(loc) + "\n" for loc in locations))
+    assert read_locations(tmp_path / 'a.json') == read_locations(tmp_path / 'a.ndjson') == locations
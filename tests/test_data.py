@@ -1,11 +1,17 @@
-import json
+from pathlib import Path
 
-with open('data/complete_locations.json', 'r') as f:
-    data = json.load(f)
+from convert_data_to_jsonformat import read_locations
+from data_quality import build_report, scan_locations
 
-zeros = [loc for loc in data if loc['latitude'] == 0.0 and loc['longitude'] == 0.0]
-print(f"Locations with (0,0) coordinates: {len(zeros)}")
-print("✅ All done!" if len(zeros) == 0 else "❌ Still need to fix some locations")
+DATA_PATH = Path(__file__).parent.parent / 'data' / 'complete_locations.json'
 
-#Locations with (0,0) coordinates: 0
-#✅ All done!
\ No newline at end of file
+
+def test_complete_locations_are_geocoded_and_valid():
+    locations = read_locations(DATA_PATH)
+    report = build_report(DATA_PATH, locations, scan_locations(locations))
+    counts = report['counts']
+
+    print(f"Locations with (0,0) coordinates: {counts['zero_coordinates']}")
+    for check in ('missing_field', 'empty_field', 'bad_type', 'zero_coordinates',
+                  'outside_us', 'outside_state', 'unknown_state'):
+        assert counts[check] == 0, [item for item in report['issues'] if item['check'] == check][:5]
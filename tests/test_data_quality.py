@@ -0,0 +1,74 @@
+import json
+
+from data_quality import find_failed_geocodes, main, scan_locations
+from data_validator import validate_entry
+
+
+def checks(issues):
+    return [(item['index'], item['check']) for item in issues]
+
+
+def test_clean_locations_have_no_issues(make_location):
+    assert scan_locations([make_location(1), make_location(2)]) == []
+
+
+def test_every_check_is_reported_once_per_entry(make_location):
+    locations = [
+        make_location(0),
+        make_location(1, latitude=0.0, longitude=0.0),
+        make_location(2, latitude=47.6, longitude=-122.3),        # Seattle, labelled AZ
+        make_location(3, latitude=51.5, longitude=-0.12),         # London
+        make_location(4, state='Arizona'),
+        make_location(5, latitude='33.4', is_active='yes'),
+        make_location(6, city=''),
+        make_location(0),                                         # same id and machine
+    ]
+    del locations[6]['address']
+
+    assert checks(scan_locations(locations)) == [
+        (1, 'zero_coordinates'),
+        (2, 'outside_state'),
+        (3, 'outside_us'),
+        (4, 'unknown_state'),
+        (5, 'bad_type'),
+        (5, 'bad_type'),
+        (6, 'missing_field'),
+        (6, 'empty_field'),
+        (7, 'duplicate_id'),
+        (7, 'duplicate_machine_id'),
+    ]
+
+
+def test_validator_keeps_its_messages(make_location):
+    entry = make_location(1, city='', latitude='x')
+    del entry['state']
+    assert validate_entry(entry, 4) == [
+        "Entry 4 missing field: state",
+        "Entry 4 field 'city' is empty",
+        "Entry 4 latitude must be a number",
+    ]
+
+
+def test_find_failed_geocodes_writes_json_and_text(tmp_path, make_location):
+    source = tmp_path / 'complete.json'
+    source.write_text(json.dumps([make_location(1), make_location(2, latitude=0.0, longitude=0.0)]))
+
+    failed = find_failed_geocodes(source, tmp_path / 'failed.json', tmp_path / 'failed.txt')
+
+    assert [loc['id'] for loc in failed] == ['frys_Q00002']
+    assert json.loads((tmp_path / 'failed.json').read_text()) == failed
+    assert 'ID: frys_Q00002' in (tmp_path / 'failed.txt').read_text()
+
+
+def test_cli_writes_report_and_fails_on_selected_checks(tmp_path, make_location):
+    source = tmp_path / 'locations.ndjson'
+    source.write_text('\n'.join(json.dumps(loc) for loc in [make_location(1), make_location(1)]))
+    report_path = tmp_path / 'report.json'
+
+    assert main([str(source), '--output', str(report_path), '--fail-on', 'zero_coordinates']) == 0
+    assert main([str(source), '--output', str(report_path), '--fail-on', 'duplicate_id']) == 1
+
+    report = json.loads(report_path.read_text())
+    assert report['records'] == 2
+    assert report['counts']['duplicate_id'] == 1
+    assert report['issues'][0]['id'] == 'frys_Q00001'
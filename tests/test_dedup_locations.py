@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import import_locations_to_db as importer
+from dedup_locations import (
+    apply_merge_suggestions, candidate_pairs, combine_suggestions, find_duplicates,
+)
+
+
+def test_grid_finds_only_pairs_within_radius(make_location):
+    locations = [
+        make_location(0),
+        make_location(1, latitude=33.0001, longitude=-112.0001),   # ~14 m away
+        make_location(2, latitude=33.0010, longitude=-112.0),      # ~111 m away
+    ]
+    pairs = [(i, j) for i, j, _ in candidate_pairs(locations, radius_m=30)]
+    assert pairs == [(0, 1)]
+
+
+@pytest.mark.parametrize("latitude, longitude", [(47.6, -122.3), (33.45, -112.07)])
+def test_grid_finds_north_south_pairs_at_western_longitudes(latitude, longitude, make_location):
+    # 25 m apart along a meridian; per-point cos scaling put these cells apart
+    step = 25 / 111_320
+    for offset in range(40):
+        lat = latitude + offset * step / 7
+        locations = [make_location(0, latitude=lat, longitude=longitude),
+                     make_location(1, latitude=lat + step, longitude=longitude)]
+        assert [(i, j) for i, j, _ in candidate_pairs(locations, radius_m=30)] == [(0, 1)]
+
+
+def test_nearby_pairs_need_matching_addresses(make_location):
+    locations = [
+        make_location(0, address="100 West Main Street"),
+        make_location(1, address="100 W Main St.", latitude=33.0001, last_verified="2024-03-01"),
+        make_location(2, address="250 Main St", latitude=33.0001, longitude=-112.0001),  # next door
+        make_location(3, address="100 w. main street", latitude=35.0),   # same address, far away
+    ]
+    suggestions = find_duplicates(locations)
+
+    assert len(suggestions) == 1
+    assert suggestions[0]["keep"] == "frys_Q00001"                # most recently verified
+    assert suggestions[0]["drop"] == ["frys_Q00000", "frys_Q00003"]
+    assert suggestions[0]["reason"] == "same_address"
+
+
+def test_similar_but_not_identical_address_is_confirmed_by_distance(make_location):
+    locations = [
+        make_location(0, address="4949 E Ray Rd"),
+        make_location(1, address="4949 E Ray Road Ste 1", latitude=33.0001),
+    ]
+    assert find_duplicates(locations)[0]["reason"] == "nearby_similar_address"
+    assert find_duplicates([locations[0], dict(locations[1], latitude=33.01)]) == []
+
+
+def test_apply_merges_fills_blanks_and_deactivates_on_import(tmp_path, make_location):
+    locations = [make_location(0), make_location(1, zip_code="85001"), make_location(2)]
+    suggestions = [{"keep": "frys_Q00000", "drop": ["frys_Q00001"]}]
+
+    remaining, dropped = apply_merge_suggestions([dict(loc) for loc in locations], suggestions)
+    assert [loc["id"] for loc in remaining] == ["frys_Q00000", "frys_Q00002"]
+    assert remaining[0]["zip_code"] == "85001"
+    assert dropped == ["frys_Q00001"]
+
+    db_path = tmp_path / 'vending.db'
+    conn = importer.connect_sqlite(str(db_path))
+    importer.import_bulk(conn, locations, dialect="sqlite")
+    conn.close()
+
+    input_path = tmp_path / 'locations.json'
+    input_path.write_text(json.dumps(locations))
+    merges_path = tmp_path / 'merges.json'
+    merges_path.write_text(json.dumps(suggestions))
+    applied_path = tmp_path / 'applied_merges.json'
+    importer.main(["--input", str(input_path), "--sqlite", str(db_path), "--apply-merges", str(merges_path),
+                   "--merges-file", str(applied_path)])
+
+    conn = importer.connect_sqlite(str(db_path))
+    rows = dict(conn.execute("SELECT id, is_active FROM vending_locations").fetchall())
+    conn.close()
+    assert rows == {"frys_Q00000": 1, "frys_Q00001": 0, "frys_Q00002": 1}
+
+    # A later plain import must not bring the duplicate back
+    importer.main(["--input", str(input_path), "--sqlite", str(db_path), "--incremental",
+                   "--merges-file", str(applied_path)])
+    conn = importer.connect_sqlite(str(db_path))
+    rows = dict(conn.execute("SELECT id, is_active FROM vending_locations").fetchall())
+    conn.close()
+    assert rows == {"frys_Q00000": 1, "frys_Q00001": 0, "frys_Q00002": 1}
+
+
+def test_combine_suggestions_unions_drops_per_survivor():
+    combined = combine_suggestions(
+        [{"keep": "a", "drop": ["b"], "reason": "same_address"}],
+        [{"keep": "a", "drop": ["c"], "reason": "nearby_similar_address"}, {"keep": "d", "drop": ["e"]}],
+    )
+    assert [(s["keep"], s["drop"]) for s in combined] == [("a", ["b", "c"]), ("d", ["e"])]
@@ -0,0 +1,30 @@
+from geocode_cache import GeocodeCache, normalize_address
+
+
+def test_normalize_address_collapses_spelling_variants():
+    assert normalize_address("150 East Old West Highway", "Apache Junction", "AZ") == \
+        normalize_address("150 E. Old West Hwy", "apache  junction", "az")
+
+
+def test_cache_round_trip_and_counters(tmp_path):
+    cache = GeocodeCache(tmp_path / 'cache.sqlite')
+    assert cache.get("1 Main St", "Phoenix", "AZ") is None
+    cache.put("1 Main Street", "Phoenix", "AZ", 33.5, -112.0)
+    assert cache.get("1 main st", "Phoenix", "AZ") == (33.5, -112.0)
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': {'auto': 1}}
+
+    # Persists across processes
+    cache.close()
+    assert GeocodeCache(tmp_path / 'cache.sqlite').get("1 Main St", "Phoenix", "AZ") == (33.5, -112.0)
+
+
+def test_manual_entries_win_and_do_not_expire(tmp_path):
+    cache = GeocodeCache(tmp_path / 'cache.sqlite', ttl_days=1)
+    cache.put("1 Main St", "Phoenix", "AZ", 1.0, 1.0, source='manual')
+    cache.put("1 Main St", "Phoenix", "AZ", 2.0, 2.0, source='auto')
+    assert cache.get("1 Main St", "Phoenix", "AZ") == (1.0, 1.0)
+
+    cache.put("2 Main St", "Phoenix", "AZ", 3.0, 3.0, source='auto')
+    cache.conn.execute("UPDATE geocodes SET updated_at = updated_at - 2 * 86400")
+    assert cache.get("2 Main St", "Phoenix", "AZ") is None
+    assert cache.get("1 Main St", "Phoenix", "AZ") == (1.0, 1.0)
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from geocoder import GeocodeJournal, NominatimBackend, NominatimGeocoder, TokenBucket
+
+
+class StubNominatim(BaseHTTPRequestHandler):
+    """Answers /search like Nominatim; addresses containing 'nowhere' have no match
+    and ones containing 'busy' are rate limited (429)"""
+    delay = 0.05
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)['q'][0]
+        time.sleep(self.delay)
+        if 'busy' in query:
+            self.send_response(429)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = [] if 'nowhere' in query else [{'lat': '33.5', 'lon': '-112.0'}]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubNominatim)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/search'
+    server.shutdown()
+
+
+def test_token_bucket_holds_rate_across_threads():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # First token is free, the other 10 are spaced 20 ms apart
+    assert time.monotonic() - started >= 0.19
+
+
+def make_locations(count):
+    return [
+        {'id': f'frys_Q{i:05d}', 'name': 'Frys', 'address': f'{i} Main St', 'city': 'Phoenix',
+         'state': 'AZ', 'latitude': 0.0, 'longitude': 0.0}
+        for i in range(count)
+    ]
+
+
+def test_concurrent_geocoding_against_stub(stub_url):
+    locations = make_locations(20)
+    locations[5]['address'] = 'nowhere'
+    locations[6].update(latitude=1.0, longitude=2.0)  # already geocoded, skipped
+
+    geocoder = NominatimGeocoder(NominatimBackend(stub_url, rate=200, burst=5), workers=8)
+    started = time.monotonic()
+    assert geocoder.geocode_locations(locations) == (18, 1)
+    # 19 requests of 50 ms each overlap instead of running back to back
+    assert time.monotonic() - started < 19 * StubNominatim.delay
+
+    assert locations[0]['latitude'] == 33.5
+    assert locations[5]['latitude'] == 0.0
+    assert locations[6]['latitude'] == 1.0
+
+
+def test_journal_resume_skips_finished_lookups(stub_url, tmp_path):
+    locations = make_locations(5)
+    journal = GeocodeJournal(tmp_path / 'run.journal', flush_every=3)
+    journal.record(locations[0], 40.0, -100.0)
+    journal.record(locations[1], None, None)
+    journal.close()
+    with open(journal.path, 'a') as f:
+        f.write('{"id": "frys_Q000')  # torn write from a crash
+
+    geocoder = NominatimGeocoder(NominatimBackend(stub_url, rate=200, burst=5), workers=2)
+    assert geocoder.geocode_locations(locations, journal) == (3, 0)
+
+    assert locations[0]['latitude'] == 40.0  # restored, not re-queried
+    assert locations[1]['latitude'] == 0.0   # recorded no-match is not retried
+    assert len(GeocodeJournal(journal.path).load()) == 5
+
+
+def test_shards_partition_the_work(stub_url):
+    geocoder = NominatimGeocoder(NominatimBackend(stub_url, rate=500, burst=10), workers=4)
+    counts = [geocoder.geocode_locations(make_locations(30), shard=(i, 3))[0] for i in range(3)]
+    assert sum(counts) == 30 and all(counts)
+
+
+def test_transient_errors_stay_pending_for_resume(stub_url, tmp_path):
+    locations = make_locations(3)
+    locations[1]['address'] = 'busy street'
+    geocoder = NominatimGeocoder(NominatimBackend(stub_url, rate=200, burst=5), workers=2)
+    assert geocoder.geocode_locations(locations, GeocodeJournal(tmp_path / 'run.journal')) == (2, 1)
+    assert 'frys_Q00001' not in GeocodeJournal(tmp_path / 'run.journal').load()
+
+    # The backend recovered: the resumed run only looks up the failed one
+    locations = make_locations(3)
+    assert geocoder.geocode_locations(locations, GeocodeJournal(tmp_path / 'run.journal')) == (1, 0)
+    assert locations[1]['latitude'] == 33.5
+
+
+def test_journal_entries_for_changed_addresses_are_looked_up_again(stub_url, tmp_path):
+    journal = GeocodeJournal(tmp_path / 'run.journal')
+    journal.record(make_locations(1)[0], 40.0, -100.0)
+    journal.close()
+
+    locations = make_locations(1)
+    locations[0]['address'] = '900 Elm St'  # same id, moved since the journal was written
+    geocoder = NominatimGeocoder(NominatimBackend(stub_url, rate=200, burst=5))
+    assert geocoder.geocode_locations(locations, journal) == (1, 0)
+    assert locations[0]['latitude'] == 33.5
+
+
+def test_finished_run_removes_its_journal(stub_url, tmp_path):
+    input_path = tmp_path / 'locations.json'
+    input_path.write_text(json.dumps(make_locations(3)))
+    journal_path = tmp_path / 'out.json.journal'
+    geocoder = NominatimGeocoder(NominatimBackend(stub_url, rate=200, burst=5))
+
+    geocoder.geocode_all_locations(input_path, tmp_path / 'out.json', journal_path)
+    assert not journal_path.exists()
+
+    geocoder.geocode_all_locations(input_path, tmp_path / 'shard.json', journal_path, shard=(0, 1))
+    assert journal_path.exists()  # kept for --apply-journal
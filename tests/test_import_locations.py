@@ -0,0 +1,66 @@
+import import_locations_to_db as importer
+
+
+def test_bulk_sqlite_import_batches_and_upserts(tmp_path, make_location):
+    conn = importer.connect_sqlite(str(tmp_path / 'vending.db'))
+    locations = [make_location(i) for i in range(25)]
+
+    assert importer.import_bulk(conn, locations, batch_size=10, dialect="sqlite") == (25, 0, 0)
+
+    locations[3]["city"] = "Tempe"
+    assert importer.import_bulk(conn, locations + [make_location(99)], batch_size=10, dialect="sqlite") == (1, 25, 0)
+    assert conn.execute("SELECT city FROM vending_locations WHERE id = 'frys_Q00003'").fetchone() == ("Tempe",)
+    assert conn.execute("SELECT COUNT(*) FROM vending_locations").fetchone() == (26,)
+
+
+def test_failed_batch_falls_back_to_rows(tmp_path, make_location):
+    conn = importer.connect_sqlite(str(tmp_path / 'vending.db'))
+    locations = [make_location(i) for i in range(5)]
+    locations[2]["id"] = None  # violates NOT NULL primary key
+
+    inserted, _, errors = importer.import_bulk(conn, locations, batch_size=5, dialect="sqlite")
+    assert (inserted, errors) == (4, 1)
+    assert conn.execute("SELECT COUNT(*) FROM vending_locations").fetchone() == (4,)
+
+
+def test_mysql_batch_query_has_one_placeholder_group_per_row():
+    query = importer._mysql_batch_query(3)
+    assert query.count("(%s") == 3
+    assert query.endswith("is_active = VALUES(is_active)")
+
+
+def test_incremental_import_writes_only_changes(tmp_path, make_location):
+    conn = importer.connect_sqlite(str(tmp_path / 'vending.db'))
+    locations = [make_location(i) for i in range(10)]
+    importer.import_bulk(conn, locations, dialect="sqlite")
+
+    assert importer.import_incremental(conn, locations, dialect="sqlite") == (0, 0, 0, 0)
+
+    changed = [dict(loc) for loc in locations[:8]]
+    changed[0]["latitude"] += 0.5
+    changed.append(make_location(50))
+    assert importer.import_incremental(conn, changed, dialect="sqlite") == (1, 1, 0, 2)
+
+    inactive = conn.execute("SELECT id FROM vending_locations WHERE is_active = 0 ORDER BY id").fetchall()
+    assert inactive == [("frys_Q00008",), ("frys_Q00009",)]
+    # Already-inactive rows are not deactivated again
+    assert importer.import_incremental(conn, changed, dialect="sqlite") == (0, 0, 0, 0)
+
+
+def test_record_hash_ignores_storage_representation(make_location):
+    from datetime import date
+    from decimal import Decimal
+    from location_diff import record_hash
+
+    loc = make_location(1)
+    stored = dict(loc, latitude=Decimal("33.00100000"), last_verified=date(2024, 1, 15), is_active=1)
+    assert record_hash(loc) == record_hash(stored)
+
+
+def test_load_data_line_keeps_null_marker_unescaped(make_location):
+    loc = make_location(1, zip_code=None, latitude=None, address="12\tMain\\St\n")
+    fields = importer.load_data_line(loc).rstrip("\n").split("\t")
+    row = dict(zip(importer.COLUMNS, fields))
+    assert row["zip_code"] == row["latitude"] == "\\N"
+    assert row["address"] == "12\\tMain\\\\St\\n"
+    assert row["is_active"] == "1"
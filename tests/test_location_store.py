@@ -0,0 +1,59 @@
+import json
+
+from location_store import LocationStore
+from manual_geocoder_updater import update_locations
+
+
+def write_locations(path, count=5):
+    locations = [{'id': f'frys_Q{i}', 'name': 'Frys', 'address': f'{i} Main St',
+                  'latitude': 0.0, 'longitude': 0.0} for i in range(count)]
+    path.write_text(json.dumps(locations, indent=2))
+    return locations
+
+
+def test_updates_are_journaled_and_saved_in_batches(tmp_path):
+    path = tmp_path / 'locations.json'
+    write_locations(path)
+    original = path.read_text()
+
+    store = LocationStore(path, save_every=3)
+    assert store.update('frys_Q1', latitude=1.0, longitude=1.0)
+    assert store.update('frys_Q2', latitude=2.0, longitude=2.0)
+    assert not store.update('missing', latitude=9.0)
+    assert path.read_text() == original          # not rewritten yet
+    assert len(store.journal_path.read_text().splitlines()) == 2
+
+    store.update('frys_Q3', latitude=3.0, longitude=3.0)
+    assert json.loads(path.read_text())[3]['latitude'] == 3.0
+    assert not store.journal_path.exists()
+    assert store.get('frys_Q1')['latitude'] == 1.0
+
+
+def test_journal_is_recovered_after_a_crash(tmp_path):
+    path = tmp_path / 'locations.json'
+    write_locations(path)
+
+    crashed = LocationStore(path, save_every=100)
+    crashed.update('frys_Q4', latitude=4.0, longitude=4.0)
+    crashed.journal.close()  # process dies without save()
+
+    reopened = LocationStore(path)
+    assert reopened.get('frys_Q4')['latitude'] == 4.0
+    assert json.loads(path.read_text())[4]['latitude'] == 4.0
+
+
+def test_update_locations_matches_by_id_or_name_address(tmp_path):
+    path = tmp_path / 'locations.json'
+    locations = write_locations(path) + [{'id': 'frys_Q2', 'name': 'Frys', 'address': '2 Main St',
+                                          'latitude': 0.0, 'longitude': 0.0}]
+    path.write_text(json.dumps(locations))
+    updates = [
+        {'id': 'frys_Q0', 'name': 'Frys', 'address': 'moved', 'lat': 1.0, 'lng': 1.0},
+        {'name': 'Frys', 'address': '2 Main St', 'lat': 2.0, 'lng': 2.0},
+        {'name': 'Frys', 'address': 'nowhere', 'lat': 3.0, 'lng': 3.0},
+    ]
+    with LocationStore(path) as store:
+        assert update_locations(store, updates) == 2
+        assert update_locations(store, updates) == 0  # already applied
+    # Journaled through the store, and a repeated id gets the edit in every copy
+    assert [loc['latitude'] for loc in json.loads(path.read_text())] == [1.0, 0.0, 2.0, 0.0, 0.0, 2.0]
@@ -0,0 +1,30 @@
+from geocode_cache import GeocodeCache
+from merge_geocoded_data import merge_sources
+
+
+def loc(location_id, lat=0.0, lng=0.0):
+    return {'id': location_id, 'address': f'{location_id} St', 'city': 'Mesa', 'state': 'AZ',
+            'latitude': lat, 'longitude': lng}
+
+
+def test_merge_is_keyed_by_id_not_position():
+    auto = {x['id']: x for x in [loc('a', 1, 1), loc('b'), loc('c', 3, 3), loc('d')]}
+    manual = {x['id']: x for x in [loc('d', 4, 4), loc('b', 2, 2)]}  # partial, reordered
+
+    merged, used, conflicts = merge_sources({'manual': manual, 'auto': auto}, ['manual', 'auto'])
+    assert [(x['id'], x['latitude']) for x in merged] == [('a', 1), ('b', 2), ('c', 3), ('d', 4)]
+    assert used == {'manual': 2, 'auto': 2, 'missing': 0}
+    assert conflicts == []
+
+
+def test_precedence_and_conflicts(tmp_path):
+    cache = GeocodeCache(tmp_path / 'cache.sqlite')
+    cache.put('a St', 'Mesa', 'AZ', 9.0, 9.0, source='manual')
+    auto = {'a': loc('a', 1, 1), 'b': loc('b')}
+    manual = {'a': loc('a', 1.00001, 1.00001)}
+
+    merged, used, conflicts = merge_sources({'manual': manual, 'auto': auto}, ['cache', 'manual', 'auto'], cache)
+    assert merged[0]['latitude'] == 9.0
+    assert used == {'cache': 1, 'manual': 0, 'auto': 0, 'missing': 1}
+    assert conflicts == [{'id': 'a', 'chosen': 'cache',
+                          'candidates': {'cache': [9.0, 9.0], 'manual': [1.00001, 1.00001], 'auto': [1, 1]}}]
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+from backend.app.models import Base
+
+BACKEND_DIR = Path(__file__).parent.parent / 'backend'
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    """SQLite database upgraded to head through the Alembic migrations"""
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    config = Config(str(BACKEND_DIR / 'alembic.ini'))
+    config.set_main_option('script_location', str(BACKEND_DIR / 'migrations'))
+    config.set_main_option('sqlalchemy.url', url)
+    command.upgrade(config, 'head')
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO vending_locations (id, state, latitude, longitude) VALUES "
+            + ", ".join(f"('id{i}', '{'AZ' if i % 20 else 'WA'}', {30 + i / 100}, {-120 + i / 100})"
+                        for i in range(500))
+        ))
+        conn.execute(text("ANALYZE"))
+    yield engine, config
+    engine.dispose()
+
+
+def query_plan(engine, sql):
+    with engine.connect() as conn:
+        return " ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+
+
+def test_migrations_match_the_model(migrated_engine):
+    engine, _ = migrated_engine
+    migrated = {index['name'] for index in inspect(engine).get_indexes('vending_locations')}
+    modelled = {index.name for index in Base.metadata.tables['vending_locations'].indexes}
+    assert {'ix_vending_locations_state', 'ix_vending_locations_lat_lng'} <= migrated
+    assert modelled - {'ix_vending_locations_id'} <= migrated
+
+
+def test_state_filter_uses_index(migrated_engine):
+    engine, _ = migrated_engine
+    plan = query_plan(engine, "SELECT id FROM vending_locations WHERE state = 'WA'")
+    assert 'USING INDEX ix_vending_locations_state' in plan
+
+
+def test_bounding_box_uses_index(migrated_engine):
+    engine, _ = migrated_engine
+    plan = query_plan(
+        engine,
+        "SELECT id FROM vending_locations "
+        "WHERE latitude BETWEEN 31 AND 32 AND longitude BETWEEN -119 AND -118",
+    )
+    assert 'USING INDEX ix_vending_locations_lat_lng' in plan
+
+
+def test_downgrade_removes_indexes(migrated_engine):
+    engine, config = migrated_engine
+    command.downgrade(config, '0001')
+    assert inspect(engine).get_indexes('vending_locations') == []
@@ -0,0 +1,50 @@
+import json
+import time
+
+from backend.app.search import SearchIndex
+
+with open('data/complete_locations.json', 'r') as f:
+    LOCATIONS = json.load(f)
+
+INDEX = SearchIndex(LOCATIONS)
+
+
+def ids(results):
+    return [location['id'] for _, location in results]
+
+
+def test_machine_id_lookup_ranks_exact_match_first():
+    results = INDEX.search('Q00350')
+    assert ids(results)[0].endswith('_Q00350')
+
+
+def test_all_words_must_match_as_prefixes():
+    results = INDEX.search('safeway temp', limit=50)
+    assert results
+    for _, location in results:
+        assert location['retailer'].lower().startswith('safeway')
+        assert location['city'].lower().startswith('temp')
+
+
+def test_results_are_ranked_and_limited():
+    results = INDEX.search('fr', limit=5)
+    assert len(results) == 5
+    scores = [score for score, _ in results]
+    assert scores == sorted(scores, reverse=True)
+    assert INDEX.search('') == []
+    assert INDEX.search('zzzzqqq') == []
+
+
+def test_long_words_beyond_indexed_prefix():
+    word = 'washingtonianstreet'
+    index = SearchIndex([{'id': 'a', 'address': f'1 {word}'}, {'id': 'b', 'address': '1 washingtonian'}])
+    assert ids(index.search(word)) == ['a']
+
+
+def test_prefix_queries_are_sub_millisecond():
+    queries = ['saf', 'safeway tempe', 'q003', 'fred meyer port', 'ca']
+    started = time.perf_counter()
+    for _ in range(100):
+        for query in queries:
+            INDEX.search(query)
+    assert (time.perf_counter() - started) / (100 * len(queries)) < 0.001
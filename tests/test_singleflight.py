@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from backend.app.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight(ttl=0)
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {'rows': 42}
+
+    async def main():
+        results = await asyncio.gather(*(flight.do('page', compute) for _ in range(50)))
+        other = await flight.do('other', compute)
+        return results, other
+
+    results, other = asyncio.run(main())
+    assert len(runs) == 2
+    assert all(result is results[0] for result in results)
+    assert other == {'rows': 42}
+    assert flight.stats()['coalesced'] == 49
+    assert flight.stats()['executions'] == 2
+
+
+def test_results_are_cached_for_the_ttl():
+    flight = SingleFlight(ttl=60)
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        return len(runs)
+
+    async def main():
+        return [await flight.do('key', compute) for _ in range(3)]
+
+    assert asyncio.run(main()) == [1, 1, 1]
+    assert flight.stats()['cache_hits'] == 2
+    flight.clear()
+    assert asyncio.run(flight.do('key', compute)) == 2
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flight = SingleFlight(ttl=60)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('db down')
+
+    async def main():
+        return await asyncio.gather(*(flight.do('key', fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do('key', fail))
+    assert flight.stats()['executions'] == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_work():
+    flight = SingleFlight(ttl=0)
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.02)
+        return 'page'
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do('key', compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do('key', compute))
+        await asyncio.sleep(0.005)
+        leader.cancel()  # the first client disconnects
+        return leader, await waiter
+
+    leader, result = asyncio.run(main())
+    assert leader.cancelled()
+    assert result == 'page'
+    assert len(runs) == 1
@@ -0,0 +1,114 @@
+import gzip
+import json
+
+from backend.app.cache import ARTIFACT_BUILDERS, dataset_cache
+from backend.app.columnar import decode_columns
+from backend.app.models import VendingLocation
+from backend.app.singleflight import coalescer
+
+
+def test_all_locations_sorted_and_complete(client):
+    response = client.get('/api/locations')
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1627
+    assert [loc['id'] for loc in data] == sorted(loc['id'] for loc in data)
+    assert isinstance(data[0]['latitude'], float)
+
+
+def test_etag_revalidation_returns_304(client):
+    first = client.get('/api/locations')
+    etag = first.headers['etag']
+    second = client.get('/api/locations', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.content == b''
+
+
+def test_gzip_body_is_precompressed(client):
+    response = client.get('/api/locations', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    snapshot = dataset_cache.artifacts['snapshot']
+    assert json.loads(gzip.decompress(snapshot.gzip_body)) == json.loads(snapshot.body)
+
+
+def test_snapshot_rebuilds_when_data_changes(client, session_factory):
+    etag = client.get('/api/locations').headers['etag']
+
+    with session_factory() as db:
+        db.query(VendingLocation).filter(VendingLocation.id == 'frys_Q00350').update({'city': 'Mesa'})
+        db.commit()
+    dataset_cache.invalidate()
+
+    response = client.get('/api/locations', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+    assert next(loc for loc in response.json() if loc['id'] == 'frys_Q00350')['city'] == 'Mesa'
+
+
+def test_same_length_edit_moves_the_data_version(client, session_factory):
+    az_ids = {loc['id'] for loc in client.get('/api/locations/AZ').json()}
+    assert 'frys_Q00350' in az_ids
+
+    with session_factory() as db:
+        db.query(VendingLocation).filter(VendingLocation.id == 'frys_Q00350').update({'state': 'CA'})
+        db.commit()
+    # Only re-check the version; a reload must come from the changed fingerprint
+    dataset_cache._checked_at = None
+    coalescer.clear()
+
+    az_ids = {loc['id'] for loc in client.get('/api/locations/AZ').json()}
+    assert 'frys_Q00350' not in az_ids
+
+
+def test_invalidate_reloads_even_if_the_version_is_unchanged(client, session_factory, monkeypatch):
+    async def fixed_version(db):
+        return 'unchanged'
+    monkeypatch.setattr('backend.app.cache.compute_data_version', fixed_version)
+    assert client.get('/api/locations').status_code == 200
+
+    with session_factory() as db:
+        db.query(VendingLocation).filter(VendingLocation.id == 'frys_Q00350').update({'city': 'Mesa'})
+        db.commit()
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    assert client.post('/api/admin/invalidate', headers={'X-Admin-Token': 'secret'}).status_code == 200
+
+    response = client.get('/api/locations')
+    assert next(loc for loc in response.json() if loc['id'] == 'frys_Q00350')['city'] == 'Mesa'
+
+
+def test_deactivated_rows_are_not_served(client, session_factory):
+    with session_factory() as db:
+        db.query(VendingLocation).filter(VendingLocation.id == 'frys_Q00350').update({'is_active': False})
+        db.commit()
+    dataset_cache.invalidate()
+
+    ids = {loc['id'] for loc in client.get('/api/locations').json()}
+    assert len(ids) == 1626 and 'frys_Q00350' not in ids
+    streamed = client.get('/api/locations/AZ', params={'stream': 'ndjson'}).text.splitlines()
+    assert len(streamed) == 128 and all(json.loads(line)['id'] != 'frys_Q00350' for line in streamed)
+    nearby = client.get('/api/locations/nearby', params={'lat': 33.414, 'lng': -111.544, 'radius_km': 1}).json()
+    assert all(loc['id'] != 'frys_Q00350' for loc in nearby)
+    assert client.get('/api/stats').json()['states']['AZ']['count'] == 128
+
+
+def test_rows_with_null_is_active_are_served_as_null(client, session_factory):
+    with session_factory() as db:
+        db.query(VendingLocation).filter(VendingLocation.id == 'frys_Q00350').update({'is_active': None})
+        db.commit()
+    dataset_cache.invalidate()
+
+    by_id = {loc['id']: loc for loc in client.get('/api/locations').json()}
+    assert len(by_id) == 1627 and by_id['frys_Q00350']['is_active'] is None
+    columnar = client.get('/api/locations', params={'format': 'columnar'}).json()
+    assert decode_columns(columnar)[list(by_id).index('frys_Q00350')]['is_active'] is None
+
+
+def test_reload_builds_every_artifact_from_one_row_list(client):
+    assert client.get('/api/stats').status_code == 200
+    assert set(dataset_cache.artifacts) == set(ARTIFACT_BUILDERS)
+    # The indexes share row dicts; the store itself keeps only its arrays
+    spatial = dataset_cache.artifacts['spatial_index']
+    search = dataset_cache.artifacts['search']
+    by_id = {loc['id']: loc for loc in search.locations}
+    assert all(by_id[loc['id']] is loc for cell in spatial.cells.values() for _, _, loc in cell)
+    assert not hasattr(dataset_cache.store, '_dicts')
@@ -0,0 +1,91 @@
+import json
+import random
+
+import pytest
+
+from backend.app.spatial import MAX_ROUTE_PIECES, SpatialIndex, haversine_km
+
+with open('data/complete_locations.json', 'r') as f:
+    LOCATIONS = json.load(f)
+
+INDEX = SpatialIndex(LOCATIONS)
+
+
+def brute_force(lat, lng, radius_km):
+    hits = [(haversine_km(lat, lng, loc['latitude'], loc['longitude']), loc) for loc in LOCATIONS]
+    return sorted((hit for hit in hits if hit[0] <= radius_km), key=lambda hit: hit[0])
+
+
+def test_haversine_known_distance():
+    # Phoenix -> Tucson is roughly 170 km
+    assert 165 < haversine_km(33.4484, -112.0740, 32.2226, -110.9747) < 175
+
+
+def test_within_radius_matches_brute_force():
+    rng = random.Random(42)
+    for loc in rng.sample(LOCATIONS, 25):
+        lat, lng = loc['latitude'] + 0.05, loc['longitude'] - 0.05
+        for radius_km in (1, 10, 50):
+            expected = brute_force(lat, lng, radius_km)
+            actual = INDEX.within_radius(lat, lng, radius_km)
+            assert [hit[1]['id'] for hit in actual] == [hit[1]['id'] for hit in expected]
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(7)
+    for loc in rng.sample(LOCATIONS, 25):
+        lat, lng = loc['latitude'] - 0.3, loc['longitude'] + 0.2
+        expected = brute_force(lat, lng, float('inf'))[:5]
+        actual = INDEX.nearest(lat, lng, 5)
+        assert [round(d, 6) for d, _ in actual] == [round(d, 6) for d, _ in expected]
+
+
+def test_nearest_respects_max_radius():
+    hits = INDEX.nearest(33.4484, -112.0740, 1000, max_radius_km=5)
+    assert hits and all(distance <= 5 for distance, _ in hits)
+
+
+def test_along_route_matches_brute_force_and_is_ordered():
+    # Phoenix -> Flagstaff -> Albuquerque, a few waypoints hundreds of km apart
+    route = [(33.45, -112.07), (34.54, -112.47), (35.20, -111.65), (35.08, -106.65)]
+    hits = INDEX.along_route(route, width_km=5)
+
+    def near_route(loc):
+        lat, lng = loc['latitude'], loc['longitude']
+        for (lat1, lng1), (lat2, lng2) in zip(route, route[1:]):
+            # Dense sampling of each segment is a slow but simple reference
+            for step in range(401):
+                t = step / 400
+                if haversine_km(lat, lng, lat1 + (lat2 - lat1) * t, lng1 + (lng2 - lng1) * t) <= 4.8:
+                    return True
+        return False
+
+    found = {loc['id'] for _, _, loc in hits}
+    nearby = [loc for loc in LOCATIONS if 33.3 < loc['latitude'] < 35.4 and -112.6 < loc['longitude'] < -106.5]
+    expected = {loc['id'] for loc in nearby if near_route(loc)}
+    assert expected and expected <= found
+    assert all(distance <= 5 for _, distance, _ in hits)
+    route_kms = [route_km for route_km, _, _ in hits]
+    assert route_kms == sorted(route_kms)
+    assert INDEX.along_route(route, width_km=5, limit=3) == hits[:3]
+
+
+def test_huge_radius_only_walks_occupied_cells():
+    # Unclamped, this range spans millions of mostly empty cells
+    hits = INDEX.within_radius(40, -100, 8000)
+    assert len(hits) == len(INDEX)
+    assert INDEX.within_radius(-60, 100, 500) == []
+
+
+def test_along_route_skips_segments_away_from_the_data():
+    # Near the pole a 50 km corridor is ~250 degrees of longitude wide
+    polar = [(89.0, -180 + 40 * step) for step in range(10)]
+    assert INDEX.along_route(polar, width_km=50) == []
+
+
+def test_along_route_rejects_routes_with_too_many_pieces():
+    # Back and forth across the data, each leg ~100 cell-sized pieces
+    legs = MAX_ROUTE_PIECES // 100 + 1
+    zigzag = [(35.0, -112.0 if leg % 2 else -87.0) for leg in range(legs + 1)]
+    with pytest.raises(ValueError):
+        INDEX.along_route(zigzag, width_km=5)
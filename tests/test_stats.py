@@ -0,0 +1,22 @@
+from backend.app.stats import build_stats
+
+
+def make_location(i, state, lat, lng, retailer='Frys', type='grocery'):
+    return {'id': f'l{i}', 'state': state, 'latitude': lat, 'longitude': lng,
+            'retailer': retailer, 'type': type}
+
+
+def test_counts_bbox_and_centroid():
+    stats = build_stats([
+        make_location(1, 'AZ', 33.0, -112.0),
+        make_location(2, 'AZ', 35.0, -110.0, retailer='Target', type='retail'),
+        make_location(3, 'AZ', 0.0, 0.0),                # not geocoded: counted, not located
+        make_location(4, 'WA', 47.6, -122.3, retailer='Safeway'),
+    ])
+
+    assert stats['total'] == 4
+    assert stats['states']['AZ'] == {
+        'count': 3, 'bbox': [-112.0, 33.0, -110.0, 35.0], 'centroid': [34.0, -111.0],
+    }
+    assert list(stats['retailers']) == ['Frys', 'Safeway', 'Target']
+    assert stats['types'] == {'grocery': 3, 'retail': 1}
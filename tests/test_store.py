@@ -0,0 +1,45 @@
+import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from backend.app.models import LOCATION_FIELDS
+from backend.app.store import LocationStore
+
+
+def make_row(i, state='AZ', **overrides):
+    row = {
+        'id': f'frys_Q{i:05d}', 'retailer': 'Frys', 'machine_id': f'Q{i:05d}', 'name': 'Frys',
+        'address': f'{i} Main St', 'city': 'Phoenix', 'state': state, 'zip_code': '',
+        'latitude': 33.0 + i / 100, 'longitude': -112.0, 'type': 'grocery',
+        'last_verified': datetime.date(2024, 1, 15), 'is_active': True,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_rows_are_sorted_encoded_and_json_ready():
+    store = LocationStore([make_row(2), make_row(1, latitude=Decimal('33.5'), is_active=0)])
+
+    assert store.ids == ['frys_Q00001', 'frys_Q00002']
+    assert store.floats['latitude'].dtype == np.float64
+    assert store.values['retailer'] == ['Frys']
+    assert store.codes['retailer'].tolist() == [0, 0]
+    assert store.row(0) == dict(make_row(1), latitude=33.5, is_active=False, last_verified='2024-01-15')
+    assert list(store.row(0)) == LOCATION_FIELDS
+
+
+def test_page_matches_keyset_semantics():
+    store = LocationStore([make_row(i, state='AZ' if i % 2 else 'WA') for i in range(10)])
+
+    rows, last_id = store.page(['id'], 3)
+    assert [row['id'] for row in rows] == ['frys_Q00000', 'frys_Q00001', 'frys_Q00002']
+    assert last_id == 'frys_Q00002'
+
+    rows, last_id = store.page(['id', 'state'], 3, after='frys_Q00002', state='AZ')
+    assert rows == [{'id': f'frys_Q0000{i}', 'state': 'AZ'} for i in (3, 5, 7)]
+    assert last_id == 'frys_Q00007'
+
+    rows, last_id = store.page(['id'], 3, after='frys_Q00007', state='AZ')
+    assert [row['id'] for row in rows] == ['frys_Q00009'] and last_id is None
+    assert store.page(['id'], 3, state='TX') == ([], None)
@@ -0,0 +1,42 @@
+import json
+
+from backend.app.projection import lat_to_y, lng_to_x, tile_index
+from backend.app.tiles import TileIndex
+
+with open('data/complete_locations.json', 'r') as f:
+    LOCATIONS = json.load(f)
+
+INDEX = TileIndex(LOCATIONS)
+
+
+def test_tiles_partition_points_at_every_zoom():
+    for z in (0, 3, 9, 16, 18):
+        tiles = {tile_index(lng_to_x(loc['longitude']), lat_to_y(loc['latitude']), z) for loc in LOCATIONS}
+        assert sum(len(INDEX.locations_in_tile(z, x, y)) for x, y in tiles) == len(LOCATIONS)
+
+
+def test_tile_cache_is_lru():
+    index = TileIndex(LOCATIONS, cache_size=2)
+    first = index.get_tile(4, 3, 6)
+    assert index.get_tile(4, 3, 6) is first
+    index.get_tile(4, 4, 6)
+    index.get_tile(4, 5, 6)
+    assert (4, 3, 6) not in index.cache
+    assert index.hits == 1 and index.misses == 3
+
+
+def test_tile_endpoint(client):
+    response = client.get('/tiles/4/3/6')
+    assert response.status_code == 200
+    tile = response.json()
+    assert tile['fields'][:2] == ['latitude', 'longitude']
+    assert len(tile['rows']) == len(INDEX.locations_in_tile(4, 3, 6)) > 0
+
+    assert client.get('/tiles/4/3/6', headers={'If-None-Match': response.headers['etag']}).status_code == 304
+    assert client.get('/tiles/2/9/0').status_code == 404
+
+
+def test_admin_invalidate_requires_token(client, monkeypatch):
+    assert client.post('/api/admin/invalidate').status_code == 403
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    assert client.post('/api/admin/invalidate', headers={'X-Admin-Token': 'secret'}).status_code == 200